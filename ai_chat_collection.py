@@ -3,19 +3,33 @@ AI Chat functionality for Anki flashcards with Collection Database Integration
 Uses standalone floating window with comprehensive user settings
 """
 
+import functools
+import html
 import json
 import sqlite3
 import os
+import threading
+import time
 import urllib.request
 import urllib.parse
+import urllib.error
 import re
+from collections import ChainMap
 from typing import List, Dict, Optional
 from datetime import datetime
 from pathlib import Path
 
 from aqt import mw, gui_hooks
-from aqt.qt import *
-from aqt.qt import Qt, QPoint
+# Explicit imports keep addon load time down vs. pulling in the whole Qt
+# namespace with a star import
+from aqt.qt import (
+    Qt, QPoint, QRect, QTimer, QThread, pyqtSignal, pyqtSlot,
+    QAction, QApplication, QCheckBox, QColor, QColorDialog, QComboBox,
+    QDialog, QDoubleSpinBox, QFileDialog, QFormLayout, QGroupBox,
+    QHBoxLayout, QIcon, QImage, QLabel, QLineEdit, QMenu, QPalette, QPixmap,
+    QPushButton, QScrollArea, QSpinBox, QTabWidget, QTextBrowser,
+    QTextCursor, QTextEdit, QVBoxLayout, QWidget,
+)
 from aqt.utils import showInfo, showWarning, askUser
 from anki.hooks import addHook
 from anki.cards import Card
@@ -24,6 +38,123 @@ from anki.cards import Card
 # IMPORTANT: Replace this with your actual OpenAI API key
 OPENAI_API_KEY = "your-openai-api-key-here"
 
+OPENAI_CHAT_URL = 'https://api.openai.com/v1/chat/completions'
+
+# Keep-alive connection pool for the OpenAI endpoint. urllib3 ships with
+# Anki (a dependency of requests); reusing the TLS session saves the
+# handshake round trip on every call after the first. Fall back to plain
+# one-shot urllib if it's unavailable.
+try:
+    import urllib3
+    _http_pool = urllib3.PoolManager(num_pools=1, maxsize=2, retries=False)
+except ImportError:
+    _http_pool = None
+
+# orjson decodes the small per-token delta objects several times faster
+# than the stdlib and accepts bytes directly; it is not a hard dependency,
+# so fall back to json.loads (which also takes bytes) when absent
+try:
+    from orjson import loads as _json_loads
+    from orjson import dumps as _json_dumps  # compact UTF-8 bytes
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj):
+        return json.dumps(
+            obj, ensure_ascii=False, separators=(',', ':')
+        ).encode('utf-8')
+
+# The key is fixed for the process lifetime, so the headers dict is too
+_OPENAI_HEADERS = {
+    'Content-Type': 'application/json',
+    'Authorization': f'Bearer {OPENAI_API_KEY}'
+}
+
+def _openai_post(json_data: bytes, timeout: int = 60):
+    """POST to the chat completions endpoint, reusing a pooled connection.
+
+    Returns a file-like response usable as a context manager that supports
+    read() and line iteration, matching urllib.request.urlopen.
+    """
+    if _http_pool is not None:
+        response = _http_pool.urlopen(
+            'POST', OPENAI_CHAT_URL, body=json_data, headers=_OPENAI_HEADERS,
+            timeout=timeout, preload_content=False
+        )
+        if response.status >= 400:
+            # urllib3 doesn't raise on HTTP error statuses the way urllib
+            # does; turn them into the same HTTPError so callers keep
+            # reporting e.g. "HTTP Error 401: Unauthorized"
+            body = response.read().decode('utf-8', 'replace')
+            response.release_conn()
+            reason = response.reason or 'HTTP Error'
+            if body.strip():
+                reason = f"{reason} - {body.strip()}"
+            raise urllib.error.HTTPError(
+                OPENAI_CHAT_URL, response.status, reason, response.headers, None
+            )
+        return response
+    req = urllib.request.Request(OPENAI_CHAT_URL, data=json_data, headers=_OPENAI_HEADERS)
+    return urllib.request.urlopen(req, timeout=timeout)
+
+def _iter_sse_data(response):
+    """Yield the bytes payload of each SSE 'data:' line in a response.
+
+    Reads the stream in 8 KiB chunks and splits lines with bytes.find in C
+    instead of going through Python-level readline dispatch per line; at
+    OpenAI token rates the per-line overhead dominates the loop. Handles
+    both the urllib3 and urllib response objects returned by _openai_post.
+    """
+    read1 = getattr(response, 'read1', None)
+    if read1 is None:
+        # urllib3 1.26.x (bundled with many Anki builds) has no read1, and
+        # its read(amt) on a chunked response blocks until the full amount
+        # accumulates - which would hold back every token until the stream
+        # ends. Plain line iteration keeps the deltas flowing there.
+        for raw_line in response:
+            if raw_line.startswith(b'data: '):
+                yield raw_line[6:].strip()
+        return
+    buf = bytearray()
+    while True:
+        chunk = read1(8192)
+        if not chunk:
+            break
+        buf += chunk
+        while True:
+            newline = buf.find(b'\n')
+            if newline == -1:
+                break
+            # Copy out only the payload of data: lines; everything else
+            # (comments, blank keep-alives) is dropped without a copy
+            if buf.startswith(b'data: '):
+                yield bytes(buf[6:newline]).strip()
+            del buf[:newline + 1]
+
+_DELTA_CONTENT_MARKER = b'"content":"'
+
+def _extract_delta_content(payload: bytes) -> Optional[str]:
+    """Pull delta.content out of an OpenAI stream chunk without a full parse.
+
+    Stream chunks have a fixed shape, so the common case finds the string
+    literal after "content":" with bytes.find and decodes it directly. Any
+    backslash in the candidate (escapes) or an unexpected layout falls back
+    to json.loads. Returns None for chunks that carry no content.
+    """
+    idx = payload.find(_DELTA_CONTENT_MARKER)
+    if idx != -1:
+        start = idx + len(_DELTA_CONTENT_MARKER)
+        end = payload.find(b'"', start)
+        if end != -1 and payload.find(b'\\', start, end) == -1:
+            return payload[start:end].decode('utf-8')
+    try:
+        chunk_data = _json_loads(payload)
+    except ValueError:
+        return None  # Skip malformed chunks
+    if 'choices' in chunk_data and len(chunk_data['choices']) > 0:
+        return chunk_data['choices'][0].get('delta', {}).get('content')
+    return None
+
 # Modal window approach - much simpler and more reliable!
 
 # Default configuration
@@ -67,6 +198,10 @@ class ConfigManager:
     def __init__(self):
         self.config_path = os.path.join(mw.addonManager.addonsFolder(), "ai_chat_addon", "config.json")
         self.config = self.load_config()
+        self._theme_cache = None
+        self._style_cache = None
+        self._save_timer = None
+        self._dirty = False
     
     def load_config(self):
         """Load configuration from file or create default"""
@@ -86,11 +221,18 @@ class ConfigManager:
         return DEFAULT_CONFIG.copy()
     
     def save_config(self):
-        """Save configuration to file"""
+        """Save configuration to file (atomic write, skipped when unchanged)"""
+        if not self._dirty:
+            return
         try:
             os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
-            with open(self.config_path, 'w') as f:
+            # Write to a temp file then rename so a crash mid-write can't
+            # leave a truncated config.json behind
+            tmp_path = self.config_path + ".tmp"
+            with open(tmp_path, 'w') as f:
                 json.dump(self.config, f, indent=2)
+            os.replace(tmp_path, self.config_path)
+            self._dirty = False
         except Exception as e:
             print(f"Error saving config: {e}")
     
@@ -100,55 +242,193 @@ class ConfigManager:
     
     def set(self, key, value):
         """Set configuration value and save"""
+        if self.config.get(key) != value:
+            self._dirty = True
         self.config[key] = value
+        if key in ("color_scheme", "custom_colors"):
+            self._theme_cache = None
+            self._style_cache = None
+        self.save_config()
+
+    def update(self, mapping):
+        """Set several configuration values with a single disk write.
+
+        Used by the settings dialog, where per-key set() calls would each
+        rewrite the whole config file.
+        """
+        for key, value in mapping.items():
+            if self.config.get(key) != value:
+                self._dirty = True
+            self.config[key] = value
+            if key in ("color_scheme", "custom_colors"):
+                self._theme_cache = None
+                self._style_cache = None
         self.save_config()
 
+    def set_deferred(self, key, value):
+        """Set a value in memory and debounce the disk write.
+
+        Used for high-frequency updates (drag position, resize) where writing
+        the whole config file per mouse sample would block the GUI thread.
+        """
+        if self.config.get(key) != value:
+            self._dirty = True
+        self.config[key] = value
+        if self._save_timer is None:
+            self._save_timer = QTimer()
+            self._save_timer.setSingleShot(True)
+            self._save_timer.timeout.connect(self.save_config)
+        self._save_timer.start(300)
+
+    def theme_colors(self, is_dark=None):
+        """Resolved theme palette, cached until the theme settings change.
+
+        For the 'auto' scheme the dark-mode probe runs once per cache fill;
+        callers that already detected it can pass is_dark.
+        """
+        if self._theme_cache is None:
+            self._theme_cache = get_theme_colors(is_dark)
+        return self._theme_cache
+
+    def refresh_theme(self, is_dark=None):
+        """Drop the cached palette and re-resolve it (used whenever the
+        chat window is (re)opened or restyled so an Anki night-mode toggle
+        or theme-settings change is picked up)"""
+        self._theme_cache = None
+        self._style_cache = None
+        return self.theme_colors(is_dark)
+
+    def theme_styles(self):
+        """Prebuilt per-message HTML templates, cached alongside the palette.
+
+        One message block is rendered per chat message, so the f-string
+        formatting is paid once per theme instead of once per message.
+        """
+        if self._style_cache is None:
+            colors = self.theme_colors()
+            self._style_cache = {
+                'user_msg': (
+                    '<p align="right" style="margin: 6px 0;">'
+                    '<span style="background-color: #6c5ce7; color: white;">'
+                    '&nbsp;%s&nbsp;</span></p>'
+                ),
+                'ai_msg': '<div style="margin: 8px 0; color: {};">%s</div>'.format(colors['text_primary']),
+                'chat_css': f"""
+            QTextBrowser {{
+                border: none;
+                background-color: {colors['bg_main']};
+                color: {colors['text_primary']};
+                font-size: 14px;
+                padding: 15px;
+            }}
+            QScrollBar:vertical {{
+                background-color: #f1f3f4;
+                width: 8px;
+                border-radius: 4px;
+            }}
+            QScrollBar::handle:vertical {{
+                background-color: #c1c8cd;
+                border-radius: 4px;
+                min-height: 20px;
+            }}
+        """,
+            }
+        return self._style_cache
+
 class ChatDatabase:
     """Manages chat history storage in Anki's collection database"""
-    
+
     def __init__(self):
         self.db_path = os.path.join(mw.addonManager.addonsFolder(), "ai_chat_addon", "chat_history.db")
         self.init_db()
-    
+        # One long-lived connection keeps SQLite's page cache warm across the
+        # session; writes are serialized with a lock since Qt timers and
+        # worker callbacks may both touch it
+        self.conn = self._connect(persistent=True)
+        self._write_lock = threading.Lock()
+
+    def _connect(self, persistent=False):
+        """Open a connection with tuned PRAGMAs applied"""
+        if persistent:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_path)
+        # journal_mode=WAL persists in the database file, but the other
+        # PRAGMAs are per-connection so they're applied on every open
+        if not self.db_path.endswith(':memory:'):
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA cache_size=-8000")  # 8 MB page cache
+        return conn
+
     def init_db(self):
         """Initialize the chat history database"""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        
-        conn = sqlite3.connect(self.db_path)
+
+        conn = self._connect()
         cursor = conn.cursor()
+        # Plain INTEGER PRIMARY KEY aliases the rowid; AUTOINCREMENT would
+        # add a sqlite_sequence update to every insert for monotonicity
+        # this log doesn't need
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS chat_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 card_id INTEGER NOT NULL,
                 timestamp TEXT NOT NULL,
                 role TEXT NOT NULL,
                 content TEXT NOT NULL
             )
         ''')
+        # Lets get_chat_history run as an ordered index range scan instead of
+        # a full scan + sort as the table grows
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_chat_card_ts
+            ON chat_history(card_id, timestamp)
+        ''')
         conn.commit()
+
+        # Switch to incremental auto-vacuum on first setup so per-card
+        # history clears don't leave tombstoned pages bloating the file.
+        # Changing the mode requires a one-off VACUUM to take effect.
+        if cursor.execute("PRAGMA auto_vacuum").fetchone()[0] == 0:
+            cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            cursor.execute("VACUUM")
         conn.close()
-    
+
     def save_message(self, card_id: int, role: str, content: str):
         """Save a chat message to the database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO chat_history (card_id, timestamp, role, content)
-            VALUES (?, ?, ?, ?)
-        ''', (card_id, datetime.now().isoformat(), role, content))
-        conn.commit()
-        conn.close()
-    
+        with self._write_lock:
+            with self.conn:
+                self.conn.execute('''
+                    INSERT INTO chat_history (card_id, timestamp, role, content)
+                    VALUES (?, ?, ?, ?)
+                ''', (card_id, datetime.now().isoformat(), role, content))
+
+    def save_messages(self, card_id: int, messages: List[tuple]):
+        """Save several (role, content) messages in one transaction.
+
+        executemany amortizes statement preparation and the whole batch
+        commits with a single fsync instead of one per row.
+        """
+        if not messages:
+            return
+        now = datetime.now().isoformat()
+        with self._write_lock:
+            with self.conn:
+                self.conn.executemany('''
+                    INSERT INTO chat_history (card_id, timestamp, role, content)
+                    VALUES (?, ?, ?, ?)
+                ''', [(card_id, now, role, content) for role, content in messages])
+
     def get_chat_history(self, card_id: int) -> List[Dict]:
         """Retrieve chat history for a specific card"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
+        cursor = self.conn.execute('''
             SELECT timestamp, role, content FROM chat_history
             WHERE card_id = ?
             ORDER BY timestamp ASC
         ''', (card_id,))
-        
+
         history = []
         for row in cursor.fetchall():
             history.append({
@@ -156,17 +436,41 @@ class ChatDatabase:
                 'role': row[1],
                 'content': row[2]
             })
-        
-        conn.close()
+
         return history
-    
+
+    def iter_chat_history(self, card_id: int):
+        """Stream (role, content) tuples for a card, oldest first.
+
+        Cheaper than get_chat_history for rendering: no per-row dict
+        allocation and no intermediate list.
+        """
+        cursor = self.conn.execute('''
+            SELECT role, content FROM chat_history
+            WHERE card_id = ?
+            ORDER BY timestamp ASC
+        ''', (card_id,))
+        yield from cursor
+
     def clear_chat_history(self, card_id: int):
         """Clear chat history for a specific card"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM chat_history WHERE card_id = ?", (card_id,))
-        conn.commit()
-        conn.close()
+        with self._write_lock:
+            with self.conn:
+                self.conn.execute("DELETE FROM chat_history WHERE card_id = ?", (card_id,))
+        # Reclaim freed pages a little later so it doesn't block the UI
+        QTimer.singleShot(5000, self._incremental_vacuum)
+
+    def _incremental_vacuum(self):
+        """Release up to 200 freed pages back to the filesystem"""
+        try:
+            with self._write_lock:
+                self.conn.execute("PRAGMA incremental_vacuum(200)")
+        except sqlite3.Error as e:
+            print(f"AI Chat: incremental vacuum failed: {e}")
+
+    def close(self):
+        """Close the persistent connection"""
+        self.conn.close()
 
 def is_dark_mode():
     """Detect if Anki is using dark mode"""
@@ -182,8 +486,11 @@ def is_dark_mode():
     except:
         return False
 
-def get_theme_colors():
-    """Get appropriate colors based on current theme and user preferences"""
+def get_theme_colors(is_dark=None):
+    """Get appropriate colors based on current theme and user preferences.
+
+    The explicit schemes never touch the Qt palette; for 'auto' the caller
+    may pass an already-detected is_dark to skip the probe."""
     color_scheme = config_manager.get("color_scheme", "auto")
     
     # Custom color scheme
@@ -221,7 +528,9 @@ def get_theme_colors():
     
     # Auto (follow Anki's theme)
     else:
-        if is_dark_mode():
+        if is_dark is None:
+            is_dark = is_dark_mode()
+        if is_dark:
             return {
                 'bg_main': '#2b2b2b',
                 'bg_secondary': '#383838',
@@ -246,35 +555,107 @@ def get_theme_colors():
                 'accent_color': '#6c5ce7'
             }
 
+# Markdown handling compiled once at import; convert_markdown_to_html runs on
+# every streamed token update, so the whole pass is fused into a single
+# alternation regex — one walk over the buffer instead of one per pattern.
+_MD_INLINE = re.compile(
+    r'(?P<bold>\*\*(?P<bold_t>.*?)\*\*)'
+    r'|(?P<italic>\*(?P<italic_t>.*?)\*)'
+    r'|(?P<code>`(?P<code_t>.*?)`)'
+)
+
+_MD_COMBINED = re.compile(
+    r'(?P<h3>^### (?P<h3_t>.+)$)'
+    r'|(?P<h2>^## (?P<h2_t>.+)$)'
+    r'|(?P<h1>^# (?P<h1_t>.+)$)'
+    r'|(?P<bold>\*\*(?P<bold_t>.*?)\*\*)'
+    r'|(?P<italic>\*(?P<italic_t>.*?)\*)'
+    r'|(?P<code>`(?P<code_t>.*?)`)'
+    r'|(?P<num>^(?P<num_n>\d+)\.\s+(?P<num_t>.+)$)'
+    r'|(?P<bul>^[•\-\*]\s+(?P<bul_t>.+)$)',
+    re.MULTILINE
+)
+
+_CODE_STYLE = "background-color: rgba(128,128,128,0.2); padding: 2px 4px; border-radius: 3px; font-family: monospace;"
+
+def _md_inline_repl(m):
+    """Render an inline bold/italic/code match to HTML"""
+    if m.group('bold') is not None:
+        return '<b>%s</b>' % m.group('bold_t')
+    if m.group('italic') is not None:
+        return '<i>%s</i>' % m.group('italic_t')
+    return '<code style="%s">%s</code>' % (_CODE_STYLE, m.group('code_t'))
+
+def _md_repl(m):
+    """Dispatch a combined-pattern match to the right HTML snippet"""
+    if m.group('bold') is not None or m.group('italic') is not None or m.group('code') is not None:
+        return _md_inline_repl(m)
+    # Block-level matches still get inline formatting applied to their text
+    if m.group('h3') is not None:
+        return '<h3 style="font-size: 16px; font-weight: bold; margin: 12px 0 8px 0; color: #6c5ce7;">%s</h3>' % _MD_INLINE.sub(_md_inline_repl, m.group('h3_t'))
+    if m.group('h2') is not None:
+        return '<h2 style="font-size: 18px; font-weight: bold; margin: 16px 0 10px 0; color: #6c5ce7;">%s</h2>' % _MD_INLINE.sub(_md_inline_repl, m.group('h2_t'))
+    if m.group('h1') is not None:
+        return '<h1 style="font-size: 20px; font-weight: bold; margin: 20px 0 12px 0; color: #6c5ce7;">%s</h1>' % _MD_INLINE.sub(_md_inline_repl, m.group('h1_t'))
+    if m.group('num') is not None:
+        return '<div style="margin: 4px 0;"><b>%s.</b> %s</div>' % (m.group('num_n'), _MD_INLINE.sub(_md_inline_repl, m.group('num_t')))
+    return '<div style="margin: 4px 0;">• %s</div>' % _MD_INLINE.sub(_md_inline_repl, m.group('bul_t'))
+
 def convert_markdown_to_html(text: str) -> str:
     """Convert basic markdown formatting to HTML"""
-    # Convert headers BEFORE converting line breaks
-    # ### Header 3 -> <h3>
-    text = re.sub(r'^### (.+)$', r'<h3 style="font-size: 16px; font-weight: bold; margin: 12px 0 8px 0; color: #6c5ce7;">\1</h3>', text, flags=re.MULTILINE)
-    # ## Header 2 -> <h2>  
-    text = re.sub(r'^## (.+)$', r'<h2 style="font-size: 18px; font-weight: bold; margin: 16px 0 10px 0; color: #6c5ce7;">\1</h2>', text, flags=re.MULTILINE)
-    # # Header 1 -> <h1>
-    text = re.sub(r'^# (.+)$', r'<h1 style="font-size: 20px; font-weight: bold; margin: 20px 0 12px 0; color: #6c5ce7;">\1</h1>', text, flags=re.MULTILINE)
-    
-    # Convert **bold** to <b>bold</b>
-    text = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', text)
-    
-    # Convert *italic* to <i>italic</i>
-    text = re.sub(r'\*(.*?)\*', r'<i>\1</i>', text)
-    
-    # Convert `code` to <code>code</code>
-    text = re.sub(r'`(.*?)`', r'<code style="background-color: rgba(128,128,128,0.2); padding: 2px 4px; border-radius: 3px; font-family: monospace;">\1</code>', text)
-    
+    text = _MD_COMBINED.sub(_md_repl, text)
+
     # Convert newlines to <br> for proper line breaks
-    text = text.replace('\n', '<br>')
-    
-    # Convert numbered lists (basic support)
-    text = re.sub(r'^(\d+)\.\s+(.+)$', r'<div style="margin: 4px 0;"><b>\1.</b> \2</div>', text, flags=re.MULTILINE)
-    
-    # Convert bullet points
-    text = re.sub(r'^[•\-\*]\s+(.+)$', r'<div style="margin: 4px 0;">• \1</div>', text, flags=re.MULTILINE)
-    
-    return text
+    return text.replace('\n', '<br>')
+
+# Card content is stripped of markup on every reviewer transition
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+def _strip_html(text: str) -> str:
+    """Simple HTML tag removal"""
+    # Remove HTML tags (pattern compiled once at module load; this runs
+    # on every reviewer card transition), then decode entities in one
+    # pass — also covers numeric entities the chained replaces missed
+    # (&nbsp; decodes to \xa0, normalized back to a plain space)
+    return html.unescape(_HTML_TAG_RE.sub('', text)).replace('\xa0', ' ').strip()
+
+# Streaming re-converts the same unfinished tail many times (chunks land
+# faster than paragraphs complete) and reopening a chat re-converts the same
+# stored messages, so conversions are memoized on the raw text
+_convert_markdown_cached = functools.lru_cache(maxsize=256)(convert_markdown_to_html)
+
+@functools.lru_cache(maxsize=8)
+def _scaled_pixmap(path: str, mtime: float, size: int):
+    """Load and scale a button image once per (path, mtime, size).
+
+    The mtime key makes edits to the image file invalidate naturally;
+    repeat previews and button rebuilds skip the disk read and the
+    SmoothTransformation rescale. Returns None for unloadable images."""
+    pixmap = QPixmap(path)
+    if pixmap.isNull():
+        return None
+    return pixmap.scaled(size, size,
+                         Qt.AspectRatioMode.KeepAspectRatio,
+                         Qt.TransformationMode.SmoothTransformation)
+
+# Resize direction lookup indexed by (bottom<<3) | (top<<2) | (right<<1) | left
+_RESIZE_DIRS = [
+    None, "left", "right", None,
+    "top", "top-left", "top-right", "top",
+    "bottom", "bottom-left", "bottom-right", "bottom",
+    None, "left", "right", None,
+]
+
+_RESIZE_CURSORS = {
+    "top": Qt.CursorShape.SizeVerCursor,
+    "bottom": Qt.CursorShape.SizeVerCursor,
+    "left": Qt.CursorShape.SizeHorCursor,
+    "right": Qt.CursorShape.SizeHorCursor,
+    "top-left": Qt.CursorShape.SizeFDiagCursor,
+    "bottom-right": Qt.CursorShape.SizeFDiagCursor,
+    "top-right": Qt.CursorShape.SizeBDiagCursor,
+    "bottom-left": Qt.CursorShape.SizeBDiagCursor,
+}
 
 class AIFloatingChatWindow(QDialog):
     """Standalone floating chat window with modern UI"""
@@ -283,19 +664,40 @@ class AIFloatingChatWindow(QDialog):
         super().__init__(parent)
         self.card = card
         self.card_content = card_content
-        self.chat_db = ChatDatabase()
+        # Built once per chat session instead of per request
+        self.system_prompt = (
+            f"{config_manager.get('ai_instructions', DEFAULT_CONFIG['ai_instructions'])} "
+            f"The current flashcard content is: {card_content}."
+        )
+        self.chat_db = get_chat_db()
         self.config = config_manager.config
-        self.theme_colors = get_theme_colors()
         self.current_ai_bubble = None  # Track current streaming bubble
+        # Chat history rows, shared by summary and flashcard generation;
+        # invalidated whenever a new message is stored
+        self._history_cache = None
+        # User message of the exchange in flight; persisted together with
+        # the AI reply so the pair commits atomically without holding a
+        # database lock across the asynchronous round trip
+        self._pending_user = None
+        self.worker = None
+        # Detached workers kept alive until their threads finish; dropping
+        # the last reference to a running QThread aborts Anki
+        self._stale_workers = []
+
+        # Coalesce streaming renders to ~30 fps: tokens can arrive far
+        # faster than layout + scroll are worth doing
+        self._stream_timer = QTimer(self)
+        self._stream_timer.setSingleShot(True)
+        self._stream_timer.setInterval(32)
+        self._stream_timer.timeout.connect(self._flush_stream)
         
         self.init_window()
         self.init_ui()
+        # Theme- and config-dependent styling lives in apply_theme so the
+        # reused window can re-run it when retargeted or re-configured
+        self.apply_theme()
         self.load_chat_history()
-        
-        # Make window stay on top if configured
-        if self.config.get("window_always_on_top", True):
-            self.setWindowFlags(self.windowFlags() | Qt.WindowType.WindowStaysOnTopHint)
-        
+
         # Modal window naturally prevents key conflicts with Anki
     
     def init_window(self):
@@ -312,17 +714,7 @@ class AIFloatingChatWindow(QDialog):
         # Remove window frame for modern look but keep resize capability
         self.setWindowFlags(Qt.WindowType.Tool | Qt.WindowType.FramelessWindowHint)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
-        
-        # Set window style with theme colors
-        bg_color = self.theme_colors['bg_secondary']
-        self.setStyleSheet(f"""
-            QDialog {{
-                background-color: {bg_color};
-                border-radius: 12px;
-                border: 1px solid rgba(108, 92, 231, 0.3);
-            }}
-        """)
-    
+
     def init_ui(self):
         """Initialize the modern chat interface"""
         layout = QVBoxLayout(self)
@@ -439,74 +831,26 @@ class AIFloatingChatWindow(QDialog):
         
         layout.addWidget(header)
         
-        # Chat area with theme-aware styling (fixed padding)
-        self.chat_scroll = QScrollArea()
-        bg_main = self.theme_colors['bg_main']
-        self.chat_scroll.setStyleSheet(f"""
-            QScrollArea {{
-                border: none;
-                background-color: {bg_main};
-            }}
-            QScrollBar:vertical {{
-                background-color: #f1f3f4;
-                width: 8px;
-                border-radius: 4px;
-            }}
-            QScrollBar::handle:vertical {{
-                background-color: #c1c8cd;
-                border-radius: 4px;
-                min-height: 20px;
-            }}
-        """)
-        self.chat_scroll.setWidgetResizable(True)
-        self.chat_scroll.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-        self.chat_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        
-        self.chat_widget = QWidget()
-        self.chat_layout = QVBoxLayout(self.chat_widget)
-        self.chat_layout.setContentsMargins(15, 15, 15, 15)  # Fixed padding
-        self.chat_layout.setSpacing(10)  # Fixed spacing
-        self.chat_layout.addStretch()
-        
-        self.chat_scroll.setWidget(self.chat_widget)
-        layout.addWidget(self.chat_scroll)
-        
-        # Input area with theme-aware styling (fixed sizing)
-        input_container = QWidget()
-        bg_secondary = self.theme_colors['bg_secondary']
-        border_color = self.theme_colors['border']
-        input_container.setStyleSheet(f"""
-            QWidget {{
-                background-color: {bg_secondary};
-                border-bottom-left-radius: 12px;
-                border-bottom-right-radius: 12px;
-                border-top: 1px solid {border_color};
-            }}
-        """)
-        input_container.setFixedHeight(70)  # Fixed input height
-        input_layout = QHBoxLayout(input_container)
+        # Chat area: one QTextBrowser holding the whole conversation as a
+        # single QTextDocument — far less overhead than a widget per bubble
+        self.chat_view = QTextBrowser()
+        self.chat_view.setOpenExternalLinks(True)
+        # Display-only document: without this, every streamed edit is
+        # recorded on the undo stack and memory grows with response length
+        self.chat_view.setUndoRedoEnabled(False)
+        self.chat_view.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+        self.chat_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        layout.addWidget(self.chat_view)
+
+        # Input area (fixed sizing); themed styling comes from apply_theme
+        self.input_container = QWidget()
+        self.input_container.setFixedHeight(70)  # Fixed input height
+        input_layout = QHBoxLayout(self.input_container)
         input_layout.setContentsMargins(15, 15, 15, 15)
-        
-        # Simple QLineEdit with theme-aware styling (fixed sizing)
+
+        # Simple QLineEdit (fixed sizing)
         self.message_input = QLineEdit()
         self.message_input.setPlaceholderText("Ask about this flashcard...")
-        bg_input = self.theme_colors['bg_input']
-        text_color = self.theme_colors['text_primary']
-        border_color = self.theme_colors['border']
-        self.message_input.setStyleSheet(f"""
-            QLineEdit {{
-                border: 1px solid {border_color};
-                border-radius: 20px;
-                padding: 10px 15px;
-                font-size: 14px;
-                background-color: {bg_input};
-                color: {text_color};
-            }}
-            QLineEdit:focus {{
-                border: 2px solid #6c5ce7;
-                background-color: {bg_input};
-            }}
-        """)
         self.message_input.returnPressed.connect(self.send_message)
         
         # Send button (fixed sizing)
@@ -537,7 +881,7 @@ class AIFloatingChatWindow(QDialog):
         input_layout.addWidget(self.message_input)
         input_layout.addWidget(self.send_button)
         
-        layout.addWidget(input_container)
+        layout.addWidget(self.input_container)
         
         # Enable dragging and resizing
         self.dragging = False
@@ -546,16 +890,76 @@ class AIFloatingChatWindow(QDialog):
         self.resize_direction = None
         self.resize_start_geometry = QRect()
         self.resize_start_mouse = QPoint()
+        self._current_cursor_shape = Qt.CursorShape.ArrowCursor
         
         # Auto-focus input if configured
         if self.config.get("auto_focus_input", True):
             self.message_input.setFocus()
-    
+
+    def apply_theme(self):
+        """(Re)apply theme- and config-dependent styling to the window.
+
+        The window instance is reused across cards and settings changes, so
+        everything derived from the palette (dialog chrome, chat view,
+        input area) has to be re-applied here - set once at construction it
+        would keep the old palette while newly rendered messages picked up
+        the new one."""
+        # Re-probe dark mode so an Anki night-mode toggle under the 'auto'
+        # scheme is noticed; later theme lookups in this window (and its
+        # dialogs) hit the cached palette
+        self._is_dark = is_dark_mode()
+        self.theme_colors = config_manager.refresh_theme(self._is_dark)
+        colors = self.theme_colors
+
+        self.setStyleSheet(f"""
+            QDialog {{
+                background-color: {colors['bg_secondary']};
+                border-radius: 12px;
+                border: 1px solid rgba(108, 92, 231, 0.3);
+            }}
+        """)
+        self.chat_view.setStyleSheet(config_manager.theme_styles()['chat_css'])
+        self.input_container.setStyleSheet(f"""
+            QWidget {{
+                background-color: {colors['bg_secondary']};
+                border-bottom-left-radius: 12px;
+                border-bottom-right-radius: 12px;
+                border-top: 1px solid {colors['border']};
+            }}
+        """)
+        self.message_input.setStyleSheet(f"""
+            QLineEdit {{
+                border: 1px solid {colors['border']};
+                border-radius: 20px;
+                padding: 10px 15px;
+                font-size: 14px;
+                background-color: {colors['bg_input']};
+                color: {colors['text_primary']};
+            }}
+            QLineEdit:focus {{
+                border: 2px solid #6c5ce7;
+                background-color: {colors['bg_input']};
+            }}
+        """)
+
+        # Keep the stay-on-top flag in step with the setting. Re-setting
+        # window flags hides a visible window, so only touch them on change
+        flags = self.windowFlags()
+        if self.config.get("window_always_on_top", True):
+            flags |= Qt.WindowType.WindowStaysOnTopHint
+        else:
+            flags &= ~Qt.WindowType.WindowStaysOnTopHint
+        if flags != self.windowFlags():
+            visible = self.isVisible()
+            self.setWindowFlags(flags)
+            if visible:
+                self.show()
+
     def closeEvent(self, event):
         """Handle window close event"""
-        # Save window size to config
-        config_manager.set("window_width", self.width())
-        config_manager.set("window_height", self.height())
+        # Save window size to config (debounced into a single write)
+        config_manager.set_deferred("window_width", self.width())
+        config_manager.set_deferred("window_height", self.height())
         super().closeEvent(event)
     
     def mousePressEvent(self, event):
@@ -567,7 +971,8 @@ class AIFloatingChatWindow(QDialog):
                 self.resizing = True
                 self.resize_start_mouse = event.globalPosition().toPoint()
                 self.resize_start_geometry = QRect(self.geometry())
-                self.setCursor(self.get_resize_cursor(self.resize_direction))
+                self._current_cursor_shape = self.get_resize_cursor(self.resize_direction)
+                self.setCursor(self._current_cursor_shape)
             else:
                 # Check if clicking on header for dragging (increased header area)
                 header_rect = QRect(0, 0, self.width(), 60)  # Larger drag area
@@ -585,69 +990,50 @@ class AIFloatingChatWindow(QDialog):
             elif self.dragging:
                 new_pos = event.globalPosition().toPoint() - self.drag_position
                 self.move(new_pos)
-                
-                # Save position
-                config_manager.set("button_position", {
+
+                # Save position (debounced; one disk write per drag)
+                config_manager.set_deferred("button_position", {
                     "x": new_pos.x(),
                     "y": new_pos.y()
                 })
             event.accept()
         else:
-            # Update cursor based on position for resize hints
+            # Update cursor based on position for resize hints; setCursor
+            # propagates through the widget tree, so skip it when unchanged
             resize_dir = self.get_resize_direction(event.position().toPoint())
-            if resize_dir:
-                self.setCursor(self.get_resize_cursor(resize_dir))
-            else:
-                self.setCursor(Qt.CursorShape.ArrowCursor)
+            desired = self.get_resize_cursor(resize_dir)
+            if desired != self._current_cursor_shape:
+                self.setCursor(desired)
+                self._current_cursor_shape = desired
     
     def mouseReleaseEvent(self, event):
         """Handle mouse release for window dragging and resizing"""
         self.dragging = False
         self.resizing = False
         self.resize_direction = None
-        self.setCursor(Qt.CursorShape.ArrowCursor)
+        if self._current_cursor_shape != Qt.CursorShape.ArrowCursor:
+            self.setCursor(Qt.CursorShape.ArrowCursor)
+            self._current_cursor_shape = Qt.CursorShape.ArrowCursor
     
     def get_resize_direction(self, pos):
-        """Determine resize direction based on cursor position"""
+        """Determine resize direction via a 4-bit edge-mask table lookup.
+
+        mouseMoveEvent runs at mouse-polling rate, so the four comparisons
+        feed an index instead of an eight-way branch ladder.
+        """
         margin = 20  # Increased resize margin for easier grabbing
-        
-        left = pos.x() <= margin
-        right = pos.x() >= self.width() - margin
-        top = pos.y() <= margin
-        bottom = pos.y() >= self.height() - margin
-        
-        if left and top:
-            return "top-left"
-        elif right and top:
-            return "top-right"
-        elif left and bottom:
-            return "bottom-left"
-        elif right and bottom:
-            return "bottom-right"
-        elif left:
-            return "left"
-        elif right:
-            return "right"
-        elif top:
-            return "top"
-        elif bottom:
-            return "bottom"
-        
-        return None
-    
+        x, y = pos.x(), pos.y()
+        idx = (
+            ((y >= self.height() - margin) << 3)
+            | ((y <= margin) << 2)
+            | ((x >= self.width() - margin) << 1)
+            | (x <= margin)
+        )
+        return _RESIZE_DIRS[idx]
+
     def get_resize_cursor(self, direction):
         """Get appropriate cursor for resize direction"""
-        cursors = {
-            "top": Qt.CursorShape.SizeVerCursor,
-            "bottom": Qt.CursorShape.SizeVerCursor,
-            "left": Qt.CursorShape.SizeHorCursor,
-            "right": Qt.CursorShape.SizeHorCursor,
-            "top-left": Qt.CursorShape.SizeFDiagCursor,
-            "bottom-right": Qt.CursorShape.SizeFDiagCursor,
-            "top-right": Qt.CursorShape.SizeBDiagCursor,
-            "bottom-left": Qt.CursorShape.SizeBDiagCursor,
-        }
-        return cursors.get(direction, Qt.CursorShape.ArrowCursor)
+        return _RESIZE_CURSORS.get(direction, Qt.CursorShape.ArrowCursor)
     
     def handle_resize(self, global_pos):
         """Handle window resizing based on direction with improved logic"""
@@ -686,82 +1072,75 @@ class AIFloatingChatWindow(QDialog):
         # Apply the new geometry
         self.setGeometry(new_rect)
     
+    def set_card(self, card: Card, card_content: str):
+        """Point the reused window at a new card.
+
+        The window instance (widgets, stylesheets, signal wiring) survives
+        across cards; only the per-card state is swapped."""
+        self.card = card
+        self.card_content = card_content
+        self.config = config_manager.config
+        self.system_prompt = (
+            f"{config_manager.get('ai_instructions', DEFAULT_CONFIG['ai_instructions'])} "
+            f"The current flashcard content is: {card_content}."
+        )
+        # Re-resolve the theme on every open, like the per-open window
+        # construction used to: a night-mode toggle or settings change
+        # since the last open must restyle the reused chrome too
+        self.apply_theme()
+        self._history_cache = None
+        # Drop any in-flight stream state from the previous card. The
+        # worker itself is detached, not just forgotten: its queued finish
+        # signal would otherwise land after the retarget and save the old
+        # card's reply into the new card's history.
+        self._detach_worker()
+        self._pending_user = None
+        self._stream_timer.stop()
+        self.current_ai_bubble = None
+        self.clear_conversation()
+        self.load_chat_history()
+        self.send_button.setEnabled(True)
+        self.message_input.setEnabled(True)
+        self.message_input.clear()
+
+    def clear_conversation(self):
+        """Empty the chat view"""
+        self.chat_view.clear()
+
     def load_chat_history(self):
         """Load and display existing chat history for this card"""
-        history = self.chat_db.get_chat_history(self.card.id)
-        
-        for message in history:
-            is_user = message['role'] == "user"
-            self.add_message_bubble(message['content'], is_user)
-    
-    def add_message_bubble(self, text: str, is_user: bool):
-        """Add a message to the chat - bubble for user, full-width for AI"""
-        message_widget = QWidget()
-        message_layout = QHBoxLayout(message_widget)
-        message_layout.setContentsMargins(0, 0, 0, 0)
-        
+        # Join the whole history into one HTML fragment so the document is
+        # parsed and laid out once instead of once per message
+        parts = [
+            self._message_html(content, role == "user")
+            for role, content in self.chat_db.iter_chat_history(self.card.id)
+        ]
+        if not parts:
+            return
+
+        cursor = self.chat_view.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertHtml("".join(parts))
+        self.scroll_to_bottom()
+
+    def _message_html(self, text: str, is_user: bool) -> str:
+        """Render a single message to its themed HTML block"""
+        styles = config_manager.theme_styles()
         if is_user:
-            # User messages: Keep as chat bubbles on the right
-            message_layout.addStretch()
-        
-            # Create message bubble with fixed sizing (don't scale with window)
-            bubble = QLabel(text)
-            bubble.setWordWrap(True)
-            bubble.setMaximumWidth(300)  # Fixed max width for user bubbles
-            bubble.setMinimumWidth(50)
-        
-            bubble.setStyleSheet("""
-                QLabel {
-                    background-color: #6c5ce7;
-                    color: white;
-                    border-radius: 18px;
-                    padding: 12px 16px;
-                    font-size: 14px;
-                    margin: 2px;
-                }
-            """)
-            
-            message_layout.addWidget(bubble)
-        else:
-            # AI messages: Full-width document style like ChatGPT with markdown support
-            ai_content = QLabel()
-            ai_content.setWordWrap(True)
-            ai_content.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
-            
-            # Convert markdown to HTML and set as rich text
-            html_text = convert_markdown_to_html(text)
-            ai_content.setText(html_text)
-            ai_content.setTextFormat(Qt.TextFormat.RichText)  # Enable HTML rendering
-            
-            # Use theme-aware colors for full-width AI content
-            bg_color = self.theme_colors['bg_main']
-            text_color = self.theme_colors['text_primary']
-            
-            ai_content.setStyleSheet(f"""
-                QLabel {{
-                    background-color: {bg_color};
-                    color: {text_color};
-                    font-size: 14px;
-                    line-height: 1.6;
-                    padding: 16px;
-                    margin: 8px 0px;
-                    border: none;
-                    border-radius: 8px;
-                }}
-            """)
-            
-            # Use full width for AI responses
-            message_layout.addWidget(ai_content)
-        
-        # Insert before the stretch
-        self.chat_layout.insertWidget(self.chat_layout.count() - 1, message_widget)
-        
-        # Scroll to bottom
-        QTimer.singleShot(10, self.scroll_to_bottom)
-    
+            return styles['user_msg'] % html.escape(text).replace('\n', '<br>')
+        return styles['ai_msg'] % _convert_markdown_cached(text)
+
+    def add_message_bubble(self, text: str, is_user: bool):
+        """Append a message to the chat document - right-aligned bubble for
+        the user, full-width markdown block for the AI"""
+        cursor = self.chat_view.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertHtml(self._message_html(text, is_user))
+        self.scroll_to_bottom()
+
     def scroll_to_bottom(self):
         """Scroll the chat to the bottom"""
-        scrollbar = self.chat_scroll.verticalScrollBar()
+        scrollbar = self.chat_view.verticalScrollBar()
         scrollbar.setValue(scrollbar.maximum())
     
     def send_message(self):
@@ -775,9 +1154,12 @@ class AIFloatingChatWindow(QDialog):
         
         # Add user message to chat
         self.add_message_bubble(user_message, is_user=True)
-        
-        # Save user message to database
-        self.chat_db.save_message(self.card.id, "user", user_message)
+
+        # Buffer the user message until the AI response lands; the pair is
+        # then written in one transaction. Holding a database transaction
+        # (and its lock) open across the exchange would deadlock the GUI
+        # thread if anything else touched the database meanwhile.
+        self._pending_user = user_message
         
         # Disable send button during response
         self.send_button.setEnabled(False)
@@ -790,86 +1172,142 @@ class AIFloatingChatWindow(QDialog):
         self.get_ai_response_streaming(user_message)
     
     def create_streaming_ai_bubble(self):
-        """Create a full-width AI content area for streaming"""
-        message_widget = QWidget()
-        message_layout = QHBoxLayout(message_widget)
-        message_layout.setContentsMargins(0, 0, 0, 0)
-        
-        # Create full-width AI content area (not a bubble)
-        ai_content = QLabel("...")  # Start with typing indicator
-        ai_content.setWordWrap(True)
-        ai_content.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
-        ai_content.setTextFormat(Qt.TextFormat.RichText)  # Enable HTML rendering for streaming
-        
-        # Use theme-aware colors for full-width AI content
-        bg_color = self.theme_colors['bg_main']
-        text_color = self.theme_colors['text_primary']
-        
-        ai_content.setStyleSheet(f"""
-            QLabel {{
-                background-color: {bg_color};
-                color: {text_color};
-                font-size: 14px;
-                line-height: 1.6;
-                padding: 16px;
-                margin: 8px 0px;
-                border: none;
-                border-radius: 8px;
-            }}
-        """)
-        
-        # Use full width for AI responses
-        message_layout.addWidget(ai_content)
-        
-        # Insert before the stretch
-        self.chat_layout.insertWidget(self.chat_layout.count() - 1, message_widget)
-        
-        # Scroll to bottom
-        QTimer.singleShot(10, self.scroll_to_bottom)
-        
-        return ai_content
-    
-    def update_streaming_bubble(self, text):
-        """Update the streaming AI bubble with new text"""
-        if self.current_ai_bubble:
-            # Convert markdown to HTML for streaming updates
-            html_text = convert_markdown_to_html(text)
-            self.current_ai_bubble.setText(html_text)
-            # Scroll to bottom to follow the conversation
-            QTimer.singleShot(10, self.scroll_to_bottom)
-    
+        """Begin a streamed AI block at the end of the chat document"""
+        cursor = self.chat_view.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        self._stream_block_pos = cursor.position()
+
+        # Incremental rendering state: completed paragraphs are promoted
+        # into the document once and never rewritten; each update only
+        # replaces the short unfinished tail after _stream_fixed_pos
+        self._stream_fixed_pos = self._stream_block_pos
+        self._pending_raw = ""
+
+        self._replace_stream_tail("...")  # Typing indicator
+        self.scroll_to_bottom()
+
+        # Truthy marker: callers treat current_ai_bubble as the
+        # stream-in-progress flag
+        return True
+
+    def _replace_stream_tail(self, html_text: str, fix: bool = False):
+        """Replace the unfinished tail of the in-progress AI block.
+
+        Content before _stream_fixed_pos is final and never touched again;
+        fix=True promotes the inserted HTML into that finalized region."""
+        cursor = self.chat_view.textCursor()
+        at_start = self._stream_fixed_pos == self._stream_block_pos
+        cursor.setPosition(self._stream_fixed_pos)
+        cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
+        cursor.removeSelectedText()
+        if at_start:
+            # First insertion opens the styled message block; later tail
+            # inserts inherit its formatting
+            html_text = config_manager.theme_styles()['ai_msg'] % html_text
+        cursor.insertHtml(html_text)
+        if fix:
+            self._stream_fixed_pos = cursor.position()
+
+    @pyqtSlot(str)
+    def update_streaming_bubble(self, delta):
+        """Buffer a newly streamed delta; rendering happens on the timer"""
+        if self.current_ai_bubble:
+            # The worker emits only the new text; finished paragraphs are
+            # already fixed in the document
+            self._pending_raw += delta
+            if not self._stream_timer.isActive():
+                self._stream_timer.start()
+
+    def _flush_stream(self):
+        """Render the buffered stream tail (one layout + scroll per flush)"""
+        if not self.current_ai_bubble:
+            return
+
+        # Only follow the stream if the user hasn't scrolled up to read
+        # something earlier
+        scrollbar = self.chat_view.verticalScrollBar()
+        follow = scrollbar.value() >= scrollbar.maximum() - 4
+
+        if '\n\n' in self._pending_raw:
+            done, self._pending_raw = self._pending_raw.rsplit('\n\n', 1)
+            self._replace_stream_tail(_convert_markdown_cached(done + '\n\n'), fix=True)
+
+        self._replace_stream_tail(_convert_markdown_cached(self._pending_raw))
+        if follow:
+            self.scroll_to_bottom()
+
+    @pyqtSlot(str)
     def finish_streaming_response(self, final_text):
         """Finish the streaming response and save to database"""
         if self.current_ai_bubble:
-            # Convert final markdown to HTML
-            html_text = convert_markdown_to_html(final_text)
-            self.current_ai_bubble.setText(html_text)
+            # Cancel any pending coalesced flush; paragraphs already
+            # promoted stay put, only the remaining tail needs converting
+            self._stream_timer.stop()
+            self._replace_stream_tail(_convert_markdown_cached(self._pending_raw), fix=True)
             self.current_ai_bubble = None
-        
-        # Save AI response to database (save original markdown text)
-        self.chat_db.save_message(self.card.id, "assistant", final_text)
-        
+
+        # Save the user/AI pair in one transaction (original markdown text);
+        # a blank response is not worth a row
+        pending_user, self._pending_user = self._pending_user, None
+        messages = []
+        if pending_user is not None:
+            messages.append(("user", pending_user))
+        if final_text and final_text.strip():
+            messages.append(("assistant", final_text))
+        self.chat_db.save_messages(self.card.id, messages)
+        self._history_cache = None
+
         # Re-enable input
         self.send_button.setEnabled(True)
         self.message_input.setEnabled(True)
         self.message_input.setFocus()
-        
+
         # Final scroll to bottom
-        QTimer.singleShot(10, self.scroll_to_bottom)
+        self.scroll_to_bottom()
     
+    def _detach_worker(self):
+        """Abandon the current streaming worker, ignoring its late signals.
+
+        Disconnecting is enough to drop whatever it still emits; the thread
+        is parked in _stale_workers until it finishes so the QThread object
+        isn't destroyed while running."""
+        worker = self.worker
+        if worker is None:
+            return
+        self.worker = None
+        for signal in (worker.chunk_received, worker.response_finished,
+                       worker.error_occurred):
+            try:
+                signal.disconnect()
+            except TypeError:
+                pass  # Already disconnected
+        if worker.isRunning():
+            self._stale_workers.append(worker)
+            worker.finished.connect(
+                lambda w=worker: self._stale_workers.remove(w))
+
     def get_ai_response_streaming(self, user_message: str):
         """Get AI response using OpenAI API with streaming"""
-        # Create a worker thread to handle the streaming API call
-        self.worker = StreamingWorker(user_message, self.card_content, self.config)
+        # Create a worker thread to handle the streaming API call; any
+        # previous worker is detached first so self.worker never rebinds
+        # over a still-running thread
+        self._detach_worker()
+        self.worker = StreamingWorker(user_message, self.system_prompt, self.config)
         self.worker.chunk_received.connect(self.update_streaming_bubble)
         self.worker.response_finished.connect(self.finish_streaming_response)
         self.worker.error_occurred.connect(self.handle_streaming_error)
         self.worker.start()
     
+    @pyqtSlot(str)
     def handle_streaming_error(self, error_message):
         """Handle errors during streaming"""
+        # Drop the buffered user message so the failed pair leaves no trace
+        self._pending_user = None
         if self.current_ai_bubble:
-            self.current_ai_bubble.setText(f"Error: {error_message}")
+            # Rewrite the whole block: partially streamed text is dropped
+            self._stream_timer.stop()
+            self._stream_fixed_pos = self._stream_block_pos
+            self._replace_stream_tail(f"Error: {html.escape(error_message)}")
             self.current_ai_bubble = None
         
         # Re-enable input
@@ -883,22 +1321,50 @@ class AIFloatingChatWindow(QDialog):
         if settings_dialog.exec():
             # Reload config after settings change
             self.config = config_manager.config
+            self.system_prompt = (
+                f"{config_manager.get('ai_instructions', DEFAULT_CONFIG['ai_instructions'])} "
+                f"The current flashcard content is: {self.card_content}."
+            )
+            # Refresh the manager's cached settings (hotkey, button, theme)
+            # too - otherwise only the add-on-menu path picks them up
+            if chat_manager:
+                chat_manager.refresh_settings()
+            # Restyle this window with the new theme; rendered messages
+            # carry inline colors, so re-render them as well unless a
+            # stream is mid-flight (its tail positions must not move)
+            self.apply_theme()
+            if self.current_ai_bubble is None:
+                self.clear_conversation()
+                self.load_chat_history()
     
+    def _build_conversation_text(self, chat_history):
+        """Build the prompt text for summary/flashcard generation.
+
+        Joined in one pass — the old += loop re-copied the whole string per
+        message, which gets quadratic on long chats."""
+        parts = [
+            f"{'You' if message['role'] == 'user' else 'AI'}: {message['content']}"
+            for message in chat_history
+        ]
+        return f"Flashcard: {self.card_content}\n\nConversation:\n" + "\n\n".join(parts) + "\n\n"
+
+    def _get_chat_history(self):
+        """Chat history rows for this card, fetched at most once per edit"""
+        if self._history_cache is None:
+            self._history_cache = self.chat_db.get_chat_history(self.card.id)
+        return self._history_cache
+
     def generate_conversation_summary(self):
         """Generate a summary of the conversation and show save dialog"""
         # Get all chat history for this card
-        chat_history = self.chat_db.get_chat_history(self.card.id)
+        chat_history = self._get_chat_history()
         
         if not chat_history or len(chat_history) < 2:
             showWarning("Not enough conversation to summarize. Have a chat first!")
             return
         
-        # Build conversation text
-        conversation_text = f"Flashcard: {self.card_content}\n\nConversation:\n"
-        for message in chat_history:
-            role = "You" if message['role'] == "user" else "AI"
-            conversation_text += f"{role}: {message['content']}\n\n"
-        
+        conversation_text = self._build_conversation_text(chat_history)
+
         # Open dialog immediately and start streaming
         dialog = SummaryDialog(self, "", self.card)  # Start with empty summary
         dialog.start_streaming_summary(conversation_text, self.config)
@@ -914,11 +1380,13 @@ class AIFloatingChatWindow(QDialog):
         # Show loading indicator
         showInfo("Generating conversation summary... Please wait.")
     
+    @pyqtSlot(str)
     def show_summary_dialog(self, summary_text: str):
         """Show dialog with summary and save options"""
         dialog = SummaryDialog(self, summary_text, self.card)
         dialog.exec()
     
+    @pyqtSlot(str)
     def handle_summary_error(self, error_message: str):
         """Handle summary generation errors"""
         showWarning(f"Failed to generate summary: {error_message}")
@@ -926,18 +1394,14 @@ class AIFloatingChatWindow(QDialog):
     def generate_flashcards(self):
         """Generate new flashcards from the conversation"""
         # Get all chat history for this card
-        chat_history = self.chat_db.get_chat_history(self.card.id)
+        chat_history = self._get_chat_history()
         
         if not chat_history or len(chat_history) < 2:
             showWarning("Not enough conversation to generate flashcards. Have a chat first!")
             return
         
-        # Build conversation text
-        conversation_text = f"Flashcard: {self.card_content}\n\nConversation:\n"
-        for message in chat_history:
-            role = "You" if message['role'] == "user" else "AI"
-            conversation_text += f"{role}: {message['content']}\n\n"
-        
+        conversation_text = self._build_conversation_text(chat_history)
+
         # Open flashcard generation dialog
         dialog = FlashcardGenerationDialog(self, conversation_text, self.card, self.config)
         dialog.exec()
@@ -955,19 +1419,67 @@ class SettingsDialog(QDialog):
         self.setWindowTitle("AI Chat Settings")
         self.setFixedSize(500, 700)
         self.setModal(True)
-        
+
         layout = QVBoxLayout(self)
-        
-        # Create tabs
-        tabs = QTabWidget()
-        
-        # General tab
-        general_tab = QWidget()
+
+        # Tabs are built on first activation, so opening the dialog only
+        # pays for the General tab; untouched tabs keep their config values
+        self.tabs = QTabWidget()
+        self._tab_builders = [
+            self._build_general_tab,
+            self._build_appearance_tab,
+            self._build_theme_tab,
+            self._build_button_tab,
+            self._build_controls_tab,
+        ]
+        self._built_tabs = set()
+        for name in ("General", "Appearance", "Theme", "Button", "Controls"):
+            self.tabs.addTab(QWidget(), name)
+        self.tabs.currentChanged.connect(self._ensure_tab_built)
+        self._ensure_tab_built(0)
+
+        layout.addWidget(self.tabs)
+
+        # Buttons
+        button_layout = QHBoxLayout()
+
+        reset_btn = QPushButton("Reset to Defaults")
+        reset_btn.clicked.connect(self.reset_defaults)
+
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+
+        save_btn = QPushButton("Save")
+        save_btn.clicked.connect(self.save_settings)
+        save_btn.setDefault(True)
+
+        button_layout.addWidget(reset_btn)
+        button_layout.addStretch()
+        button_layout.addWidget(cancel_btn)
+        button_layout.addWidget(save_btn)
+
+        layout.addLayout(button_layout)
+
+    def _ensure_tab_built(self, index):
+        """Build a tab's widgets the first time it is shown"""
+        if index in self._built_tabs:
+            return
+        self._built_tabs.add(index)
+        self._tab_builders[index](self.tabs.widget(index))
+
+    def _build_all_tabs(self):
+        """Force-build every tab (needed before a full reset)"""
+        for index in range(self.tabs.count()):
+            self._ensure_tab_built(index)
+
+    def _build_general_tab(self, general_tab):
+        """Build the General tab"""
+        cfg = ChainMap(self.config, DEFAULT_CONFIG)
         general_layout = QFormLayout(general_tab)
-        
+
         # AI Instructions
         self.ai_instructions_text = QTextEdit()
-        self.ai_instructions_text.setPlainText(self.config.get("ai_instructions", DEFAULT_CONFIG["ai_instructions"]))
+        self.ai_instructions_text.setPlainText(cfg["ai_instructions"])
         self.ai_instructions_text.setMaximumHeight(100)
         general_layout.addRow("AI Instructions:", self.ai_instructions_text)
         
@@ -980,13 +1492,13 @@ class SettingsDialog(QDialog):
             "gpt-4o",
             "gpt-4o-mini"
         ])
-        self.model_combo.setCurrentText(self.config.get("openai_model", "gpt-3.5-turbo"))
+        self.model_combo.setCurrentText(cfg["openai_model"])
         general_layout.addRow("AI Model:", self.model_combo)
         
         # Max tokens
         self.max_tokens_spin = QSpinBox()
         self.max_tokens_spin.setRange(50, 2000)
-        self.max_tokens_spin.setValue(self.config.get("max_tokens", 300))
+        self.max_tokens_spin.setValue(cfg["max_tokens"])
         general_layout.addRow("Max Response Length:", self.max_tokens_spin)
         
         # Temperature
@@ -994,63 +1506,61 @@ class SettingsDialog(QDialog):
         self.temperature_spin.setRange(0.0, 2.0)
         self.temperature_spin.setSingleStep(0.1)
         self.temperature_spin.setDecimals(1)
-        self.temperature_spin.setValue(self.config.get("temperature", 0.7))
+        self.temperature_spin.setValue(cfg["temperature"])
         general_layout.addRow("Creativity (Temperature):", self.temperature_spin)
         
         # Auto focus input
         self.auto_focus_check = QCheckBox()
-        self.auto_focus_check.setChecked(self.config.get("auto_focus_input", True))
+        self.auto_focus_check.setChecked(cfg["auto_focus_input"])
         general_layout.addRow("Auto-focus input field:", self.auto_focus_check)
         
         # Always on top
         self.always_on_top_check = QCheckBox()
-        self.always_on_top_check.setChecked(self.config.get("window_always_on_top", True))
+        self.always_on_top_check.setChecked(cfg["window_always_on_top"])
         general_layout.addRow("Keep window on top:", self.always_on_top_check)
-        
-        tabs.addTab(general_tab, "General")
-        
-        # Appearance tab
-        appearance_tab = QWidget()
+
+    def _build_appearance_tab(self, appearance_tab):
+        """Build the Appearance tab"""
+        cfg = ChainMap(self.config, DEFAULT_CONFIG)
         appearance_layout = QFormLayout(appearance_tab)
-        
+
         # Window size
         self.window_width_spin = QSpinBox()
         self.window_width_spin.setRange(300, 800)
-        self.window_width_spin.setValue(self.config.get("window_width", 400))
+        self.window_width_spin.setValue(cfg["window_width"])
         appearance_layout.addRow("Window Width:", self.window_width_spin)
         
         self.window_height_spin = QSpinBox()
         self.window_height_spin.setRange(400, 1000)
-        self.window_height_spin.setValue(self.config.get("window_height", 600))
+        self.window_height_spin.setValue(cfg["window_height"])
         appearance_layout.addRow("Window Height:", self.window_height_spin)
         
         # Button settings
         self.show_button_check = QCheckBox()
-        self.show_button_check.setChecked(self.config.get("show_button", True))
+        self.show_button_check.setChecked(cfg["show_button"])
         appearance_layout.addRow("Show floating button:", self.show_button_check)
         
         self.button_size_spin = QSpinBox()
         self.button_size_spin.setRange(30, 80)
-        self.button_size_spin.setValue(self.config.get("button_size", 50))
+        self.button_size_spin.setValue(cfg["button_size"])
         appearance_layout.addRow("Button Size:", self.button_size_spin)
         
         self.button_opacity_spin = QDoubleSpinBox()
         self.button_opacity_spin.setRange(0.1, 1.0)
         self.button_opacity_spin.setSingleStep(0.1)
         self.button_opacity_spin.setDecimals(1)
-        self.button_opacity_spin.setValue(self.config.get("button_opacity", 0.9))
+        self.button_opacity_spin.setValue(cfg["button_opacity"])
         appearance_layout.addRow("Button Opacity:", self.button_opacity_spin)
-        
-        tabs.addTab(appearance_tab, "Appearance")
-        
-        # Theme tab
-        theme_tab = QWidget()
+
+    def _build_theme_tab(self, theme_tab):
+        """Build the Theme tab (the most expensive: nine color swatches)"""
+        cfg = ChainMap(self.config, DEFAULT_CONFIG)
         theme_layout = QFormLayout(theme_tab)
-        
+
         # Color scheme selection
         self.color_scheme_combo = QComboBox()
         self.color_scheme_combo.addItems(["Auto (Follow Anki)", "Light", "Dark", "Custom"])
-        current_scheme = self.config.get("color_scheme", "auto")
+        current_scheme = cfg["color_scheme"]
         scheme_map = {"auto": 0, "light": 1, "dark": 2, "custom": 3}
         self.color_scheme_combo.setCurrentIndex(scheme_map.get(current_scheme, 0))
         self.color_scheme_combo.currentTextChanged.connect(self.on_color_scheme_changed)
@@ -1061,7 +1571,7 @@ class SettingsDialog(QDialog):
         custom_colors_layout = QFormLayout(self.custom_colors_group)
         
         # Custom color controls
-        custom_colors = self.config.get("custom_colors", DEFAULT_CONFIG["custom_colors"])
+        custom_colors = cfg["custom_colors"]
         self.color_buttons = {}
         
         color_labels = {
@@ -1079,8 +1589,7 @@ class SettingsDialog(QDialog):
         for key, label in color_labels.items():
             color_btn = QPushButton()
             color_btn.setFixedSize(50, 30)
-            color_value = custom_colors.get(key, "#ffffff")
-            color_btn.setStyleSheet(f"background-color: {color_value}; border: 1px solid #ccc;")
+            self._set_swatch_color(color_btn, custom_colors.get(key, "#ffffff"))
             color_btn.clicked.connect(lambda checked, k=key: self.choose_color(k))
             self.color_buttons[key] = color_btn
             custom_colors_layout.addRow(f"{label}:", color_btn)
@@ -1089,19 +1598,18 @@ class SettingsDialog(QDialog):
         
         # Update custom colors visibility
         self.on_color_scheme_changed()
-        
-        tabs.addTab(theme_tab, "Theme")
-        
-        # Button Customization tab
-        button_tab = QWidget()
+
+    def _build_button_tab(self, button_tab):
+        """Build the Button customization tab"""
+        cfg = ChainMap(self.config, DEFAULT_CONFIG)
         button_layout = QFormLayout(button_tab)
-        
+
         # Button icon selection
         self.button_icon_combo = QComboBox()
         icon_options = ["🤖 Robot", "🧠 Brain", "💬 Chat", "⚡ Lightning", "🌟 Star", "🔥 Fire", "💎 Diamond", "🚀 Rocket", "Custom Image"]
         self.button_icon_combo.addItems(icon_options)
         
-        current_icon = self.config.get("button_icon", "🤖")
+        current_icon = cfg["button_icon"]
         icon_map = {"🤖": 0, "🧠": 1, "💬": 2, "⚡": 3, "🌟": 4, "🔥": 5, "💎": 6, "🚀": 7, "custom": 8}
         self.button_icon_combo.setCurrentIndex(icon_map.get(current_icon, 0))
         self.button_icon_combo.currentTextChanged.connect(self.on_button_icon_changed)
@@ -1112,7 +1620,7 @@ class SettingsDialog(QDialog):
         custom_image_layout = QHBoxLayout(self.custom_image_group)
         
         self.custom_image_path = QLineEdit()
-        self.custom_image_path.setText(self.config.get("custom_button_image_path", ""))
+        self.custom_image_path.setText(cfg["custom_button_image_path"])
         self.custom_image_path.setPlaceholderText("Path to image file (PNG, JPG, SVG)")
         
         browse_btn = QPushButton("Browse...")
@@ -1131,21 +1639,20 @@ class SettingsDialog(QDialog):
         
         # Update custom image visibility
         self.on_button_icon_changed()
-        
-        tabs.addTab(button_tab, "Button")
-        
-        # Controls tab
-        controls_tab = QWidget()
+
+    def _build_controls_tab(self, controls_tab):
+        """Build the Controls tab"""
+        cfg = ChainMap(self.config, DEFAULT_CONFIG)
         controls_layout = QFormLayout(controls_tab)
-        
+
         # Hotkey setting
         self.hotkey_edit = QLineEdit()
-        self.hotkey_edit.setText(self.config.get("hotkey", "Ctrl+Shift+A"))
+        self.hotkey_edit.setText(cfg["hotkey"])
         self.hotkey_edit.setPlaceholderText("e.g., Ctrl+Shift+A, Alt+C, F1")
         controls_layout.addRow("Hotkey to open chat:", self.hotkey_edit)
         
         # Button position
-        pos = self.config.get("button_position", {"x": 50, "y": 50})
+        pos = cfg["button_position"]
         
         self.button_x_spin = QSpinBox()
         self.button_x_spin.setRange(0, 2000)
@@ -1156,34 +1663,12 @@ class SettingsDialog(QDialog):
         self.button_y_spin.setRange(0, 2000)
         self.button_y_spin.setValue(pos.get("y", 50))
         controls_layout.addRow("Button Y Position:", self.button_y_spin)
-        
-        tabs.addTab(controls_tab, "Controls")
-        
-        layout.addWidget(tabs)
-        
-        # Buttons
-        button_layout = QHBoxLayout()
-        
-        reset_btn = QPushButton("Reset to Defaults")
-        reset_btn.clicked.connect(self.reset_defaults)
-        
-        cancel_btn = QPushButton("Cancel")
-        cancel_btn.clicked.connect(self.reject)
-        
-        save_btn = QPushButton("Save")
-        save_btn.clicked.connect(self.save_settings)
-        save_btn.setDefault(True)
-        
-        button_layout.addWidget(reset_btn)
-        button_layout.addStretch()
-        button_layout.addWidget(cancel_btn)
-        button_layout.addWidget(save_btn)
-        
-        layout.addLayout(button_layout)
-    
+
     def reset_defaults(self):
         """Reset all settings to default values"""
         if askUser("Reset all settings to default values?"):
+            # Every tab's widgets get reset, so they all need to exist
+            self._build_all_tabs()
             # Update UI with defaults
             self.ai_instructions_text.setPlainText(DEFAULT_CONFIG["ai_instructions"])
             self.model_combo.setCurrentText(DEFAULT_CONFIG["openai_model"])
@@ -1206,8 +1691,7 @@ class SettingsDialog(QDialog):
             # Reset custom colors
             default_colors = DEFAULT_CONFIG["custom_colors"]
             for key, color_btn in self.color_buttons.items():
-                color_value = default_colors.get(key, "#ffffff")
-                color_btn.setStyleSheet(f"background-color: {color_value}; border: 1px solid #ccc;")
+                self._set_swatch_color(color_btn, default_colors.get(key, "#ffffff"))
             
             # Reset button settings
             self.button_icon_combo.setCurrentIndex(0)  # Robot
@@ -1219,21 +1703,21 @@ class SettingsDialog(QDialog):
         is_custom = "Custom" in self.color_scheme_combo.currentText()
         self.custom_colors_group.setEnabled(is_custom)
     
+    def _set_swatch_color(self, color_btn, color_value):
+        """Store the hex on the button and update its visual swatch.
+
+        The value is kept as a widget property so reads are O(1) instead of
+        parsing it back out of the stylesheet string."""
+        color_btn.setProperty("color_hex", color_value)
+        color_btn.setStyleSheet(f"background-color: {color_value}; border: 1px solid #ccc;")
+
     def choose_color(self, color_key):
         """Open color picker for the specified color"""
-        current_color = self.color_buttons[color_key].styleSheet()
-        # Extract current color from stylesheet
-        import re
-        match = re.search(r'background-color:\s*([^;]+)', current_color)
-        if match:
-            current_hex = match.group(1).strip()
-        else:
-            current_hex = "#ffffff"
-        
+        current_hex = self.color_buttons[color_key].property("color_hex") or "#ffffff"
+
         color = QColorDialog.getColor(QColor(current_hex), self, f"Choose {color_key} Color")
         if color.isValid():
-            hex_color = color.name()
-            self.color_buttons[color_key].setStyleSheet(f"background-color: {hex_color}; border: 1px solid #ccc;")
+            self._set_swatch_color(self.color_buttons[color_key], color.name())
     
     def on_button_icon_changed(self):
         """Handle button icon selection change"""
@@ -1259,9 +1743,8 @@ class SettingsDialog(QDialog):
             image_path = self.custom_image_path.text().strip()
             if image_path and os.path.exists(image_path):
                 try:
-                    pixmap = QPixmap(image_path)
-                    if not pixmap.isNull():
-                        scaled_pixmap = pixmap.scaled(50, 50, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+                    scaled_pixmap = _scaled_pixmap(image_path, os.path.getmtime(image_path), 50)
+                    if scaled_pixmap is not None:
                         self.preview_button.setIcon(QIcon(scaled_pixmap))
                         self.preview_button.setText("")
                     else:
@@ -1282,68 +1765,99 @@ class SettingsDialog(QDialog):
                 self.preview_button.setText(emoji)
     
     def save_settings(self):
-        """Save settings and close dialog"""
+        """Save settings and close dialog.
+
+        Only tabs that were actually opened contribute to the patch —
+        unbuilt tabs have no widgets and their config values are unchanged.
+        The whole patch goes to disk as a single config-file write."""
         try:
-            # Validate hotkey format
-            hotkey = self.hotkey_edit.text().strip()
-            if not hotkey:
-                showWarning("Please enter a hotkey.")
-                return
-            
-            # Validate AI instructions
-            ai_instructions = self.ai_instructions_text.toPlainText().strip()
-            if not ai_instructions:
-                showWarning("Please enter AI instructions.")
-                return
-            
-            # Save all settings
-            config_manager.set("ai_instructions", ai_instructions)
-            config_manager.set("openai_model", self.model_combo.currentText())
-            config_manager.set("max_tokens", self.max_tokens_spin.value())
-            config_manager.set("temperature", self.temperature_spin.value())
-            config_manager.set("auto_focus_input", self.auto_focus_check.isChecked())
-            config_manager.set("window_always_on_top", self.always_on_top_check.isChecked())
-            config_manager.set("window_width", self.window_width_spin.value())
-            config_manager.set("window_height", self.window_height_spin.value())
-            config_manager.set("show_button", self.show_button_check.isChecked())
-            config_manager.set("button_size", self.button_size_spin.value())
-            config_manager.set("button_opacity", self.button_opacity_spin.value())
-            config_manager.set("hotkey", hotkey)
-            config_manager.set("button_position", {
-                "x": self.button_x_spin.value(),
-                "y": self.button_y_spin.value()
-            })
-            
-            # Save theme settings
-            scheme_map = {0: "auto", 1: "light", 2: "dark", 3: "custom"}
-            color_scheme = scheme_map.get(self.color_scheme_combo.currentIndex(), "auto")
-            config_manager.set("color_scheme", color_scheme)
-            
-            # Save custom colors
-            custom_colors = {}
-            for key, color_btn in self.color_buttons.items():
-                style = color_btn.styleSheet()
-                import re
-                match = re.search(r'background-color:\s*([^;]+)', style)
-                if match:
-                    custom_colors[key] = match.group(1).strip()
-                else:
-                    custom_colors[key] = "#ffffff"
-            config_manager.set("custom_colors", custom_colors)
-            
-            # Save button icon settings
-            icon_map = {0: "🤖", 1: "🧠", 2: "💬", 3: "⚡", 4: "🌟", 5: "🔥", 6: "💎", 7: "🚀", 8: "custom"}
-            button_icon = icon_map.get(self.button_icon_combo.currentIndex(), "🤖")
-            config_manager.set("button_icon", button_icon)
-            config_manager.set("custom_button_image_path", self.custom_image_path.text().strip())
-            
+            patch = {}
+
+            if 0 in self._built_tabs:
+                # Validate AI instructions
+                ai_instructions = self.ai_instructions_text.toPlainText().strip()
+                if not ai_instructions:
+                    showWarning("Please enter AI instructions.")
+                    return
+                patch.update({
+                    "ai_instructions": ai_instructions,
+                    "openai_model": self.model_combo.currentText(),
+                    "max_tokens": self.max_tokens_spin.value(),
+                    "temperature": self.temperature_spin.value(),
+                    "auto_focus_input": self.auto_focus_check.isChecked(),
+                    "window_always_on_top": self.always_on_top_check.isChecked(),
+                })
+
+            if 1 in self._built_tabs:
+                patch.update({
+                    "window_width": self.window_width_spin.value(),
+                    "window_height": self.window_height_spin.value(),
+                    "show_button": self.show_button_check.isChecked(),
+                    "button_size": self.button_size_spin.value(),
+                    "button_opacity": self.button_opacity_spin.value(),
+                })
+
+            if 2 in self._built_tabs:
+                scheme_map = {0: "auto", 1: "light", 2: "dark", 3: "custom"}
+                patch.update({
+                    "color_scheme": scheme_map.get(self.color_scheme_combo.currentIndex(), "auto"),
+                    "custom_colors": {
+                        key: color_btn.property("color_hex") or "#ffffff"
+                        for key, color_btn in self.color_buttons.items()
+                    },
+                })
+
+            if 3 in self._built_tabs:
+                icon_map = {0: "🤖", 1: "🧠", 2: "💬", 3: "⚡", 4: "🌟", 5: "🔥", 6: "💎", 7: "🚀", 8: "custom"}
+                patch.update({
+                    "button_icon": icon_map.get(self.button_icon_combo.currentIndex(), "🤖"),
+                    "custom_button_image_path": self.custom_image_path.text().strip(),
+                })
+
+            if 4 in self._built_tabs:
+                # Validate hotkey format
+                hotkey = self.hotkey_edit.text().strip()
+                if not hotkey:
+                    showWarning("Please enter a hotkey.")
+                    return
+                patch.update({
+                    "hotkey": hotkey,
+                    "button_position": {
+                        "x": self.button_x_spin.value(),
+                        "y": self.button_y_spin.value()
+                    },
+                })
+
+            config_manager.update(patch)
+
             # Notify that settings were saved
             showInfo("Settings saved successfully!")
             self.accept()
-            
+
         except Exception as e:
             showWarning(f"Error saving settings: {str(e)}")
 
+class ButtonImageLoader(QThread):
+    """Worker thread that loads and scales the custom button image.
+
+    QPixmap is GUI-thread-only, so the file read and rescale happen on a
+    QImage here; the button converts it on arrival."""
+
+    image_ready = pyqtSignal(QImage)
+
+    def __init__(self, path: str, size: int):
+        super().__init__()
+        self.path = path
+        self.size = size
+
+    def run(self):
+        image = QImage(self.path)
+        if not image.isNull():
+            self.image_ready.emit(image.scaled(
+                self.size, self.size,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation))
+
 class FloatingButton(QWidget):
     """Floating button for opening chat"""
     
@@ -1353,6 +1867,7 @@ class FloatingButton(QWidget):
         self.init_button()
         self.dragging = False
         self.drag_position = QPoint()
+        self._pending_position = None  # Set while dragging, saved on release
     
     def get_position_on_anki_monitor(self, relative_pos):
         """Get absolute position on the same monitor as Anki"""
@@ -1417,7 +1932,7 @@ class FloatingButton(QWidget):
         self.move(final_pos["x"], final_pos["y"])
         
         # Get theme colors for button styling
-        theme_colors = get_theme_colors()
+        theme_colors = config_manager.theme_colors()
         accent_color = theme_colors.get('accent_color', '#6c5ce7')
         
         # Convert hex to rgba for background
@@ -1444,30 +1959,15 @@ class FloatingButton(QWidget):
         
         button_icon = self.config.get("button_icon", "🤖")
         if button_icon == "custom":
-            # Use custom image
+            # Use custom image: show the emoji placeholder immediately and
+            # swap in the pixmap once the loader thread delivers it, so a
+            # large PNG can't stall Anki startup
             custom_image_path = self.config.get("custom_button_image_path", "")
             if custom_image_path and os.path.exists(custom_image_path):
-                try:
-                    # Create label with image
-                    image_label = QLabel()
-                    pixmap = QPixmap(custom_image_path)
-                    if not pixmap.isNull():
-                        # Scale image to fit button
-                        scaled_size = int(size * 0.8)
-                        scaled_pixmap = pixmap.scaled(scaled_size, scaled_size, 
-                                                    Qt.AspectRatioMode.KeepAspectRatio, 
-                                                    Qt.TransformationMode.SmoothTransformation)
-                        image_label.setPixmap(scaled_pixmap)
-                        image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                        image_label.setStyleSheet("background: transparent;")
-                        layout.addWidget(image_label)
-                    else:
-                        # Fallback to emoji if image is invalid
-                        self._add_emoji_label(layout, "🤖", size)
-                except Exception as e:
-                    print(f"AI Chat: Error loading custom image: {e}")
-                    # Fallback to emoji
-                    self._add_emoji_label(layout, "🤖", size)
+                self._icon_label = self._add_emoji_label(layout, "🤖", size)
+                self._image_loader = ButtonImageLoader(custom_image_path, int(size * 0.8))
+                self._image_loader.image_ready.connect(self._on_button_image_ready)
+                self._image_loader.start()
             else:
                 # No custom image set, use default emoji
                 self._add_emoji_label(layout, "🤖", size)
@@ -1487,6 +1987,12 @@ class FloatingButton(QWidget):
         emoji_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         emoji_label.setStyleSheet(f"font-size: {size//2}px; background: transparent;")
         layout.addWidget(emoji_label)
+        return emoji_label
+
+    def _on_button_image_ready(self, image):
+        """Swap the placeholder emoji for the loaded custom image"""
+        self._icon_label.setText("")
+        self._icon_label.setPixmap(QPixmap.fromImage(image))
     
     def mousePressEvent(self, event):
         """Handle mouse press for dragging"""
@@ -1500,15 +2006,17 @@ class FloatingButton(QWidget):
         if event.buttons() == Qt.MouseButton.LeftButton and self.dragging:
             new_pos = event.globalPosition().toPoint() - self.drag_position
             self.move(new_pos)
-            
-            # Save position relative to Anki's monitor
-            relative_pos = self.get_relative_position_from_anki_monitor(new_pos)
-            config_manager.set("button_position", relative_pos)
+            # Persisting happens once on release, not per mouse sample
+            self._pending_position = new_pos
             event.accept()
-    
+
     def mouseReleaseEvent(self, event):
-        """Handle mouse release"""
+        """Handle mouse release; save the final drag position once"""
         self.dragging = False
+        if self._pending_position is not None:
+            relative_pos = self.get_relative_position_from_anki_monitor(self._pending_position)
+            config_manager.set("button_position", relative_pos)
+            self._pending_position = None
     
     def mouseDoubleClickEvent(self, event):
         """Handle double-click to open chat"""
@@ -1522,6 +2030,10 @@ class ChatManager:
         self.current_window = None
         self.current_card = None
         self.floating_button = None
+        # Resolved once per session; the reviewer hooks run on every card
+        # flip and shouldn't re-query the config each time
+        self._show_button = config_manager.get("show_button", True)
+        self._hotkey = config_manager.get("hotkey", "Ctrl+Shift+A")
         
         # Create floating button
         self.create_floating_button()
@@ -1532,7 +2044,7 @@ class ChatManager:
             if self.floating_button:
                 self.floating_button.close()
             
-            if config_manager.get("show_button", True):
+            if self._show_button:
                 print("AI Chat: Creating floating button...")
                 self.floating_button = FloatingButton()
                 print(f"AI Chat: Button created successfully. Visible: {self.floating_button.isVisible()}")
@@ -1546,28 +2058,28 @@ class ChatManager:
     def update_card(self, card):
         """Update current card"""
         self.current_card = card
-        
-        # Close existing window if card changed
+
+        # Hide existing window if card changed; the instance is kept for
+        # reuse and re-pointed at the new card on next open
         if self.current_window and self.current_window.card != card:
             self.current_window.close()
-            self.current_window = None
     
     def open_chat_window(self):
         """Open or focus chat window"""
         if not self.current_card:
             showWarning("No card available for chat.")
             return
-        
-        # Close existing window
-        if self.current_window:
-            self.current_window.close()
-        
+
         # Get card content
         card_content = self.get_card_content(self.current_card)
-        
-        # Create new modal window
-        self.current_window = AIFloatingChatWindow(mw, self.current_card, card_content)
-        self.current_window.setModal(True)  # Make it modal so it captures all input
+
+        # Reuse one window across the session: constructing the dialog
+        # (widgets, stylesheet parsing, signal wiring) is paid once
+        if self.current_window is None:
+            self.current_window = AIFloatingChatWindow(mw, self.current_card, card_content)
+            self.current_window.setModal(True)  # Make it modal so it captures all input
+        else:
+            self.current_window.set_card(self.current_card, card_content)
         self.current_window.show()
         self.current_window.raise_()
         self.current_window.activateWindow()
@@ -1576,8 +2088,8 @@ class ChatManager:
         """Extract readable content from the card"""
         try:
             # Get question and answer
-            question = self.strip_html(card.question())
-            answer = self.strip_html(card.answer())
+            question = _strip_html(card.question())
+            answer = _strip_html(card.answer())
             
             content = f"Question: {question}\n"
             if answer and answer != question:
@@ -1589,24 +2101,40 @@ class ChatManager:
             print(f"Error getting card content: {e}")
             return "Unable to load card content"
     
-    def strip_html(self, text: str) -> str:
-        """Simple HTML tag removal"""
-        import re
-        # Remove HTML tags
-        text = re.sub(r'<[^>]+>', '', text)
-        # Replace HTML entities
-        text = text.replace('&nbsp;', ' ').replace('&lt;', '<').replace('&gt;', '>')
-        return text.strip()
-    
     def refresh_settings(self):
         """Refresh components after settings change"""
+        self._show_button = config_manager.get("show_button", True)
+        self._hotkey = config_manager.get("hotkey", "Ctrl+Shift+A")
+        # Re-resolve the palette so the rebuilt button (and the next dialog
+        # open) pick up a scheme change immediately
+        config_manager.refresh_theme()
         self.create_floating_button()
 
 # Global instances - Note: chat_manager is created after Anki is loaded
 config_manager = ConfigManager()
-chat_db = ChatDatabase()
 chat_manager = None
 
+# Shared ChatDatabase, created lazily on first chat-window open so addon
+# import doesn't pay the makedirs + DDL cost
+_chat_db = None
+
+def get_chat_db():
+    global _chat_db
+    if _chat_db is None:
+        _chat_db = ChatDatabase()
+    return _chat_db
+
+def _close_chat_db():
+    global _chat_db
+    if _chat_db is not None:
+        _chat_db.close()
+        _chat_db = None
+
+def _close_http_pool():
+    """Drop the keep-alive connections when the profile closes"""
+    if _http_pool is not None:
+        _http_pool.clear()
+
 def init_addon():
     """Initialize the addon"""
     global chat_manager
@@ -1627,7 +2155,13 @@ def init_addon():
     
     # Add configuration menu (keep for compatibility)
     mw.addonManager.setConfigAction(__name__, show_config_dialog)
-    
+
+    # Flush any pending debounced config writes and close the shared chat
+    # DB and HTTP pool before the profile closes
+    gui_hooks.profile_will_close.append(config_manager.save_config)
+    gui_hooks.profile_will_close.append(_close_chat_db)
+    gui_hooks.profile_will_close.append(_close_http_pool)
+
     print("AI Chat: Add-on initialization complete!")
 
 def add_menu_item():
@@ -1675,9 +2209,9 @@ def toggle_floating_button():
         showWarning("Chat manager not initialized!")
         return
         
-    current_state = config_manager.get("show_button", True)
-    new_state = not current_state
+    new_state = not chat_manager._show_button
     config_manager.set("show_button", new_state)
+    chat_manager._show_button = new_state
     
     # Recreate the button with new state
     chat_manager.create_floating_button()
@@ -1701,7 +2235,7 @@ def show_config_dialog():
 
 def on_reviewer_shortcuts(shortcuts):
     """Add keyboard shortcut for AI chat"""
-    hotkey = config_manager.get("hotkey", "Ctrl+Shift+A")
+    hotkey = chat_manager._hotkey if chat_manager else config_manager.get("hotkey", "Ctrl+Shift+A")
     # Parse hotkey string into QKeySequence format
     try:
         shortcuts.append((hotkey, lambda: chat_manager.open_chat_window() if chat_manager else None))
@@ -1726,25 +2260,22 @@ class StreamingWorker(QThread):
     response_finished = pyqtSignal(str)  # Emitted when response is complete
     error_occurred = pyqtSignal(str)  # Emitted when error occurs
     
-    def __init__(self, user_message: str, card_content: str, config: dict):
+    def __init__(self, user_message: str, system_prompt: str, config: dict):
         super().__init__()
         self.user_message = user_message
-        self.card_content = card_content
+        self.system_prompt = system_prompt
         self.config = config
         self.accumulated_text = ""
     
     def run(self):
         """Run the streaming API request in background thread"""
         try:
-            # Get custom AI instructions from config
-            ai_instructions = self.config.get("ai_instructions", DEFAULT_CONFIG["ai_instructions"])
-            
-            # Prepare the conversation context with custom instructions
+            # Prepare the conversation context; the system prompt was built
+            # once when the chat window opened
             messages = [
                 {
                     "role": "system",
-                    "content": f"{ai_instructions} "
-                               f"The current flashcard content is: {self.card_content}."
+                    "content": self.system_prompt
                 },
                 {
                     "role": "user",
@@ -1762,44 +2293,41 @@ class StreamingWorker(QThread):
             }
             
             # Convert to JSON
-            json_data = json.dumps(data).encode('utf-8')
-            
-            # Create request
-            req = urllib.request.Request(
-                'https://api.openai.com/v1/chat/completions',
-                data=json_data,
-                headers={
-                    'Content-Type': 'application/json',
-                    'Authorization': f'Bearer {OPENAI_API_KEY}'
-                }
-            )
-            
-            # Make streaming API call
-            with urllib.request.urlopen(req, timeout=60) as response:
-                buffer = ""
-                for line in response:
-                    line = line.decode('utf-8').strip()
-                    
-                    if line.startswith('data: '):
-                        line = line[6:]  # Remove 'data: ' prefix
-                        
-                        if line == '[DONE]':
-                            break
-                            
-                        if line:
-                            try:
-                                chunk_data = json.loads(line)
-                                if 'choices' in chunk_data and len(chunk_data['choices']) > 0:
-                                    delta = chunk_data['choices'][0].get('delta', {})
-                                    if 'content' in delta:
-                                        new_content = delta['content']
-                                        self.accumulated_text += new_content
-                                        # Emit the accumulated text so far
-                                        self.chunk_received.emit(self.accumulated_text)
-                            except json.JSONDecodeError:
-                                continue  # Skip malformed chunks
+            json_data = _json_dumps(data)
             
+            # Make streaming API call on the pooled keep-alive connection
+            with _openai_post(json_data, timeout=60) as response:
+                # Coalesce deltas worker-side: one queued signal per ~50 ms
+                # or 64 chars instead of one per token.  Deltas collect in
+                # a parts list and are joined once per emit, avoiding the
+                # quadratic churn of growing a str with +=
+                parts = []
+                emit_start = 0
+                pending_len = 0
+                last_emit = time.monotonic()
+                for payload in _iter_sse_data(response):
+                    if payload == b'[DONE]':
+                        break
+
+                    if payload:
+                        new_content = _extract_delta_content(payload)
+                        if new_content:
+                            parts.append(new_content)
+                            pending_len += len(new_content)
+                            now = time.monotonic()
+                            if now - last_emit > 0.05 or pending_len > 64:
+                                # Emit only the new text; the GUI
+                                # accumulates, so the signal queue
+                                # carries O(N) bytes, not O(N^2)
+                                self.chunk_received.emit(''.join(parts[emit_start:]))
+                                emit_start = len(parts)
+                                pending_len = 0
+                                last_emit = now
+                if emit_start < len(parts):
+                    self.chunk_received.emit(''.join(parts[emit_start:]))
+
             # Emit final response
+            self.accumulated_text = ''.join(parts)
             if self.accumulated_text:
                 self.response_finished.emit(self.accumulated_text)
             else:
@@ -1864,43 +2392,35 @@ Conversation Summary:"""
             }
             
             # Convert to JSON
-            json_data = json.dumps(data).encode('utf-8')
-            
-            # Create request
-            req = urllib.request.Request(
-                'https://api.openai.com/v1/chat/completions',
-                data=json_data,
-                headers={
-                    'Content-Type': 'application/json',
-                    'Authorization': f'Bearer {OPENAI_API_KEY}'
-                }
-            )
-            
-            # Make streaming API call
-            with urllib.request.urlopen(req, timeout=60) as response:
-                for line in response:
-                    line = line.decode('utf-8').strip()
-                    
-                    if line.startswith('data: '):
-                        line = line[6:]  # Remove 'data: ' prefix
-                        
-                        if line == '[DONE]':
-                            break
-                            
-                        if line:
-                            try:
-                                chunk_data = json.loads(line)
-                                if 'choices' in chunk_data and len(chunk_data['choices']) > 0:
-                                    delta = chunk_data['choices'][0].get('delta', {})
-                                    if 'content' in delta:
-                                        new_content = delta['content']
-                                        self.accumulated_text += new_content
-                                        # Emit the accumulated text so far
-                                        self.chunk_received.emit(self.accumulated_text)
-                            except json.JSONDecodeError:
-                                continue  # Skip malformed chunks
+            json_data = _json_dumps(data)
             
+            # Make streaming API call on the pooled keep-alive connection
+            with _openai_post(json_data, timeout=60) as response:
+                parts = []
+                emit_start = 0
+                pending_len = 0
+                last_emit = time.monotonic()
+                for payload in _iter_sse_data(response):
+                    if payload == b'[DONE]':
+                        break
+
+                    if payload:
+                        new_content = _extract_delta_content(payload)
+                        if new_content:
+                            # Collect deltas in a list and join per emit
+                            # (at most ~20x/s) instead of growing a str;
+                            # the final signal carries the complete text
+                            parts.append(new_content)
+                            pending_len += len(new_content)
+                            now = time.monotonic()
+                            if now - last_emit > 0.05 or pending_len > 64:
+                                self.chunk_received.emit(''.join(parts[emit_start:]))
+                                emit_start = len(parts)
+                                pending_len = 0
+                                last_emit = now
+
             # Emit final response
+            self.accumulated_text = ''.join(parts)
             if self.accumulated_text:
                 self.summary_generated.emit(self.accumulated_text)
             else:
@@ -1909,6 +2429,75 @@ Conversation Summary:"""
         except Exception as e:
             self.error_occurred.emit(str(e))
 
+# Static button stylesheets shared by the summary/flashcard dialogs.  These
+# use fixed accent colors, so there is nothing to re-format per instance.
+_COPY_BTN_QSS = """
+    QPushButton {
+        background-color: #17a2b8;
+        color: white;
+        border: none;
+        border-radius: 6px;
+        padding: 8px 16px;
+        font-weight: bold;
+    }
+    QPushButton:hover {
+        background-color: #138496;
+    }
+"""
+
+_SAVE_BTN_QSS = """
+    QPushButton {
+        background-color: #28a745;
+        color: white;
+        border: none;
+        border-radius: 6px;
+        padding: 8px 16px;
+        font-weight: bold;
+    }
+    QPushButton:hover {
+        background-color: #218838;
+    }
+"""
+
+_CANCEL_BTN_QSS = """
+    QPushButton {
+        background-color: #6c757d;
+        color: white;
+        border: none;
+        border-radius: 6px;
+        padding: 8px 16px;
+    }
+    QPushButton:hover {
+        background-color: #5a6268;
+    }
+"""
+
+_REFINE_BTN_QSS = """
+    QPushButton {
+        background-color: #17a2b8;
+        color: white;
+        border: none;
+        border-radius: 4px;
+        padding: 4px 8px;
+        font-size: 11px;
+        font-weight: bold;
+    }
+    QPushButton:hover {
+        background-color: #138496;
+    }
+"""
+
+_REFINE_TITLE_QSS = """
+    QLabel {
+        font-size: 16px;
+        font-weight: bold;
+        color: #17a2b8;
+        padding: 10px;
+        margin-bottom: 10px;
+    }
+"""
+
+
 class SummaryDialog(QDialog):
     """Dialog for showing summary and choosing where to save it"""
     
@@ -1916,8 +2505,12 @@ class SummaryDialog(QDialog):
         super().__init__(parent)
         self.summary_text = summary_text
         self.card = card
-        self.theme_colors = get_theme_colors()
+        # card.note() round-trips to the collection DB; fetch it once for
+        # the field combo and the eventual save
+        self.note = card.note()
+        self.theme_colors = config_manager.theme_colors()
         self.summary_worker = None
+        self._summary_plain = None
         self.init_ui()
     
     def init_ui(self):
@@ -1989,8 +2582,7 @@ class SummaryDialog(QDialog):
         field_layout.addWidget(field_label)
         
         self.field_combo = QComboBox()
-        note = self.card.note()
-        field_names = list(note.keys())
+        field_names = list(self.note.keys())
         self.field_combo.addItems(field_names)
         self.field_combo.setStyleSheet(f"""
             QComboBox {{
@@ -2008,12 +2600,18 @@ class SummaryDialog(QDialog):
             }}
         """)
         
-        # Try to select a good default field
-        preferred_fields = ["Extra", "Notes", "Summary", "Additional Info", "Details"]
-        for preferred in preferred_fields:
-            for i, field in enumerate(field_names):
-                if preferred.lower() in field.lower():
+        # Try to select a good default field: single pass over the
+        # lowercased field names, keeping the best-ranked preferred match
+        preferred_fields = ("extra", "notes", "summary", "additional info", "details")
+        best_rank = len(preferred_fields)
+        for i, field in enumerate(field_names):
+            field_lower = field.lower()
+            for rank, preferred in enumerate(preferred_fields):
+                if rank >= best_rank:
+                    break
+                if preferred in field_lower:
                     self.field_combo.setCurrentIndex(i)
+                    best_rank = rank
                     break
         
         field_layout.addWidget(self.field_combo)
@@ -2030,50 +2628,15 @@ class SummaryDialog(QDialog):
         
         copy_btn = QPushButton("📋 Copy to Clipboard")
         copy_btn.clicked.connect(self.copy_to_clipboard)
-        copy_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #17a2b8;
-                color: white;
-                border: none;
-                border-radius: 6px;
-                padding: 8px 16px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #138496;
-            }
-        """)
-        
+        copy_btn.setStyleSheet(_COPY_BTN_QSS)
+
         save_btn = QPushButton("💾 Save to Card")
         save_btn.clicked.connect(self.save_to_card)
-        save_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #28a745;
-                color: white;
-                border: none;
-                border-radius: 6px;
-                padding: 8px 16px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #218838;
-            }
-        """)
-        
+        save_btn.setStyleSheet(_SAVE_BTN_QSS)
+
         cancel_btn = QPushButton("Cancel")
         cancel_btn.clicked.connect(self.reject)
-        cancel_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #6c757d;
-                color: white;
-                border: none;
-                border-radius: 6px;
-                padding: 8px 16px;
-            }
-            QPushButton:hover {
-                background-color: #5a6268;
-            }
-        """)
+        cancel_btn.setStyleSheet(_CANCEL_BTN_QSS)
         
         button_layout.addWidget(copy_btn)
         button_layout.addStretch()
@@ -2090,40 +2653,56 @@ class SummaryDialog(QDialog):
         self.summary_worker.error_occurred.connect(self.handle_summary_error)
         self.summary_worker.start()
     
-    def update_streaming_summary(self, text: str):
-        """Update the summary display with streaming text"""
-        # Convert markdown to HTML for display
-        html_text = convert_markdown_to_html(text)
-        self.summary_display.setHtml(html_text)
-        
-        # Scroll to bottom to follow the generation
+    @pyqtSlot(str)
+    def update_streaming_summary(self, delta: str):
+        """Append a streamed delta as plain text.
+
+        Re-rendering the whole growing document as HTML per update is
+        quadratic; the markdown pass happens exactly once at finish."""
         cursor = self.summary_display.textCursor()
-        cursor.movePosition(cursor.MoveOperation.End)
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(delta)
+        # Follow the generation
         self.summary_display.setTextCursor(cursor)
     
+    @pyqtSlot(str)
     def finish_streaming_summary(self, final_text: str):
         """Finish streaming and store final text"""
         self.summary_text = final_text
         html_text = convert_markdown_to_html(final_text)
         self.summary_display.setHtml(html_text)
+        # Capture the rendered plain text once so the copy/save buttons
+        # don't each have to walk the document again
+        self._summary_plain = self.summary_display.toPlainText()
     
+    @pyqtSlot(str)
     def handle_summary_error(self, error_message: str):
         """Handle summary generation errors"""
         self.summary_display.setHtml(f"<p style='color: red;'>Error generating summary: {error_message}</p>")
     
+    def _current_summary_text(self) -> str:
+        """Plain-text summary, honoring any manual edits.
+
+        setHtml() marks the document unmodified, so as long as the user
+        has not touched it we can reuse the plain text captured at
+        finish and skip another document-wide toPlainText() walk."""
+        if self._summary_plain is not None and not self.summary_display.document().isModified():
+            return self._summary_plain
+        return self.summary_display.toPlainText()
+
     def copy_to_clipboard(self):
         """Copy summary to clipboard"""
         clipboard = QApplication.clipboard()
-        clipboard.setText(self.summary_display.toPlainText())
+        clipboard.setText(self._current_summary_text())
         showInfo("Summary copied to clipboard!")
-    
+
     def save_to_card(self):
         """Save summary to selected card field"""
         try:
-            note = self.card.note()
+            note = self.note
             field_name = self.field_combo.currentText()
             # Get plain text version for saving (without HTML)
-            summary_text = self.summary_display.toPlainText()
+            summary_text = self._current_summary_text()
             
             if self.append_checkbox.isChecked():
                 # Append to existing content
@@ -2136,24 +2715,29 @@ class SummaryDialog(QDialog):
                 # Replace existing content
                 new_content = summary_text
             
-            # Update the note
+            # Save through Anki's update_note operation: it persists on a
+            # background thread, creates an undo entry and refreshes open
+            # screens (including the reviewer) itself - a bare backend
+            # update_note fires no operation hooks, leaving the reviewer
+            # showing stale content
             note[field_name] = new_content
-            note.flush()
-            
-            # Refresh the card display
-            from aqt import mw
-            mw.requireReset()
-            
-            showInfo(f"Summary saved successfully to '{field_name}' field!")
-            self.accept()
-            
-        except Exception as e:
+            from aqt.operations.note import update_note
+
+            def on_note_saved(_changes):
+                showInfo(f"Summary saved successfully to '{field_name}' field!")
+                self.accept()
+
+            update_note(parent=self, note=note) \
+                .success(on_note_saved) \
+                .run_in_background()
+
+        except Exception as e:
             showWarning(f"Failed to save summary: {str(e)}")
 
 class FlashcardGenerationWorker(QThread):
-    """Worker thread for generating flashcards with streaming"""
-    
-    chunk_received = pyqtSignal(str)  # Emitted when new text chunk arrives
+    """Worker thread for generating and parsing flashcards with streaming"""
+
+    card_ready = pyqtSignal(int, dict)  # Emitted per parsed card (complete or streaming)
     flashcards_generated = pyqtSignal(str)  # Emitted when generation is complete
     error_occurred = pyqtSignal(str)  # Emitted when error occurs
     
@@ -2226,43 +2810,48 @@ Generate exactly {self.card_count} flashcards:"""
             }
             
             # Convert to JSON
-            json_data = json.dumps(data).encode('utf-8')
-            
-            # Create request
-            req = urllib.request.Request(
-                'https://api.openai.com/v1/chat/completions',
-                data=json_data,
-                headers={
-                    'Content-Type': 'application/json',
-                    'Authorization': f'Bearer {OPENAI_API_KEY}'
-                }
-            )
-            
-            # Make streaming API call
-            with urllib.request.urlopen(req, timeout=60) as response:
-                for line in response:
-                    line = line.decode('utf-8').strip()
-                    
-                    if line.startswith('data: '):
-                        line = line[6:]  # Remove 'data: ' prefix
-                        
-                        if line == '[DONE]':
-                            break
-                            
-                        if line:
-                            try:
-                                chunk_data = json.loads(line)
-                                if 'choices' in chunk_data and len(chunk_data['choices']) > 0:
-                                    delta = chunk_data['choices'][0].get('delta', {})
-                                    if 'content' in delta:
-                                        new_content = delta['content']
-                                        self.accumulated_text += new_content
-                                        # Emit the accumulated text so far
-                                        self.chunk_received.emit(self.accumulated_text)
-                            except json.JSONDecodeError:
-                                continue  # Skip malformed chunks
+            json_data = _json_dumps(data)
             
+            # Make streaming API call on the pooled keep-alive connection
+            with _openai_post(json_data, timeout=60) as response:
+                # Parse on the worker thread; the GUI receives card-level
+                # signals instead of raw text it would have to re-parse
+                parser = IncrementalFlashcardParser(self.card_format)
+                parts = []
+                pending_len = 0
+                last_emit = time.monotonic()
+                for payload in _iter_sse_data(response):
+                    if payload == b'[DONE]':
+                        break
+
+                    if payload:
+                        new_content = _extract_delta_content(payload)
+                        if new_content:
+                            parts.append(new_content)
+                            pending_len += len(new_content)
+
+                            # Completed cards go out immediately
+                            base = len(parser.cards)
+                            for offset, card in enumerate(parser.feed(new_content)):
+                                self.card_ready.emit(base + offset, card)
+
+                            # The still-streaming card at most ~20x/s
+                            now = time.monotonic()
+                            if now - last_emit > 0.05 or pending_len > 64:
+                                partial = parser.partial_card()
+                                if partial is not None:
+                                    self.card_ready.emit(len(parser.cards), partial)
+                                pending_len = 0
+                                last_emit = now
+
+                # Flush the card left open when the stream ended
+                tail_start = len(parser.cards)
+                parser.finish()
+                for i in range(tail_start, len(parser.cards)):
+                    self.card_ready.emit(i, parser.cards[i])
+
             # Emit final response
+            self.accumulated_text = ''.join(parts)
             if self.accumulated_text:
                 self.flashcards_generated.emit(self.accumulated_text)
             else:
@@ -2271,6 +2860,299 @@ Generate exactly {self.card_count} flashcards:"""
         except Exception as e:
             self.error_occurred.emit(str(e))
 
+# Theme-parameterized stylesheets for the per-card preview widgets.  The
+# generation dialog formats these once per instance so the per-card
+# builders hand Qt ready-made strings instead of assembling ~10 f-strings
+# for every card.
+_PREVIEW_QSS_TEMPLATES = {
+    'placeholder': """
+        QWidget {{
+            background-color: {bg_input};
+            border: 2px dashed {border};
+            border-radius: 10px;
+            padding: 15px;
+            min-height: 80px;
+        }}
+    """,
+    'placeholder_header': """
+        QLabel {{
+            color: {text_secondary};
+            font-weight: bold;
+            font-size: 14px;
+        }}
+    """,
+    'loading_dots': """
+        QLabel {{
+            color: {text_secondary};
+            font-size: 12px;
+            text-align: center;
+        }}
+    """,
+    'card_widget': """
+        QWidget {{
+            background-color: {bg_main};
+            border: 2px solid {border};
+            border-radius: 10px;
+            padding: 5px;
+        }}
+    """,
+    'card_checkbox': """
+        QCheckBox {{
+            color: {text_primary};
+            font-weight: bold;
+            font-size: 14px;
+        }}
+        QCheckBox::indicator {{
+            width: 18px;
+            height: 18px;
+        }}
+        QCheckBox::indicator:unchecked {{
+            border: 2px solid {border};
+            background-color: {bg_main};
+            border-radius: 3px;
+        }}
+        QCheckBox::indicator:checked {{
+            border: 2px solid #28a745;
+            background-color: #28a745;
+            border-radius: 3px;
+        }}
+    """,
+    'card_textedit': """
+        QTextEdit {{
+            color: {text_primary};
+            background-color: {bg_input};
+            border-radius: 6px;
+            border: 1px solid {border};
+            font-size: 13px;
+            padding: 8px;
+        }}
+    """,
+}
+
+# Rendered preview stylesheets, cached per theme color set so reopening
+# the generation dialog reuses the formatted strings
+_PREVIEW_QSS_CACHE = {}
+
+
+def _rendered_preview_qss(theme_colors: dict) -> dict:
+    """Format the preview QSS templates for a theme, with caching"""
+    key = tuple(sorted(theme_colors.items()))
+    qss = _PREVIEW_QSS_CACHE.get(key)
+    if qss is None:
+        qss = {
+            name: tpl.format(**theme_colors)
+            for name, tpl in _PREVIEW_QSS_TEMPLATES.items()
+        }
+        _PREVIEW_QSS_CACHE[key] = qss
+    return qss
+
+
+# Field captions use a fixed accent color
+_CARD_FIELD_LABEL_QSS = "color: #6c5ce7; font-weight: bold;"
+
+# One sweep over generated card text: each match is a Front:/Back: label
+# and everything up to the next label (or end of text)
+_CARD_SECTION_RE = re.compile(
+    r'^\s*(front|back)\s*:\s*(.*?)(?=^\s*(?:front|back)\s*:|\Z)',
+    re.IGNORECASE | re.MULTILINE | re.DOTALL
+)
+
+# A real cloze deletion ({{c1::...}}), not just any "{{c" substring
+_CLOZE_RE = re.compile(r'\{\{c\d+::')
+
+# Case-insensitive "Front:"/"Back:" label at the start of a line
+_CARD_LABEL_RE = re.compile(r'(front|back):\s*(.*)$', re.IGNORECASE)
+
+# Note-type ids whose answer template has been verified this session
+_TEMPLATE_FRESH = set()
+
+# Shared answer-template tail: the AnKing-style collapsible "AI Chat
+# Summary" button with its toggle script and styling.  Defined once so
+# the four answer templates below share a single ~2 KB string instead of
+# embedding four copies.
+_AI_SUMMARY_TAIL = """{{#AI Conversation Summary}}
+<span id="hint-ai-summary" class="hintBtn" data-name="AI Conversation Summary">
+  <a href="#" class="hint" onclick="toggleHintBtn('hint-ai-summary')"></a>
+  <button id="button-ai-summary" class="button-general" onclick="toggleHintBtn('hint-ai-summary')">
+    💬 AI Chat Summary
+  </button>
+  <div dir="auto" id="ai-summary" class="hints" style="display: none;">{{AI Conversation Summary}}</div>
+</span>
+
+<script>
+// AnKing-style toggle function for AI Chat Summary
+window.toggleHintBtn = function(containerId, noScrolling=false) {
+  const container = document.getElementById(containerId)
+  const link = container.getElementsByTagName("a")[0]
+  const button = container.getElementsByTagName("button")[0]
+  const hint = container.getElementsByTagName("div")[0]
+
+  if (hint.style.display == "none") {
+    button.classList.add("expanded-button")
+    hint.style.display = "block"
+    link.style.display = "none"
+    if (!noScrolling) {
+      hint.scrollIntoView({
+        behavior: "smooth",
+        block: "start",
+        inline: "nearest"
+      });
+    }
+  } else {
+    button.classList.remove("expanded-button")
+    hint.style.display = "none"
+    link.style.display = ""
+  }
+}
+
+// AnKing-style button styling
+const style = document.createElement('style');
+style.textContent = `
+.button-general {
+  outline: 0;
+  border-radius: 0.12em;
+  border: 1px solid #525253 !important;
+  padding: 5px 5px;
+  text-align: center;
+  display: inline-block;
+  font-size: 9.5px;
+  background-color: #424242;
+  color: #AFAFAF !important;
+  margin-top: 8px;
+}
+
+.expanded-button {
+  display: block;
+  margin: auto;
+  margin-top: 10px;
+  font-weight: bold;
+  width: 50% !important;
+  background: #ababab !important;
+  color: black !important;
+  font-weight: bold;
+  width: 50% !important;
+}
+
+.hints {
+  font-style: italic;
+  font-size: 1.2rem;
+  color: #4297F9;
+}
+
+html:not(.mobile) .button-general:hover {
+  cursor: default;
+  background-color: #E9E9E9 !important;
+  color: #363638 !important;
+}
+
+/* Night mode styles */
+.nightMode .hints, .night_mode .hints {
+  color: cyan;
+}
+
+.nightMode .card, .night_mode .card {
+  background-color: #272828 !important;
+  color: #FFFAFA !important;
+}
+`;
+document.head.appendChild(style);
+</script>
+{{/AI Conversation Summary}}"""
+
+_CLOZE_AFMT = "{{cloze:Text}}<br>{{Extra}}\n\n" + _AI_SUMMARY_TAIL
+_BASIC_AFMT = '{{FrontSide}}<hr id="answer">{{Back}}\n\n' + _AI_SUMMARY_TAIL
+
+
+class IncrementalFlashcardParser:
+    """Incremental parser for streamed flashcard text.
+
+    Keeps the parse state between deltas so each feed() scans only the
+    newly arrived text instead of re-parsing the whole accumulated
+    buffer, which is quadratic over a generation. Completed cards
+    collect in .cards; the card currently streaming in is available
+    from partial_card().
+    """
+
+    def __init__(self, card_format: str):
+        self.is_cloze = card_format == "cloze"
+        self.cards: List[Dict] = []
+        self._pending = ""  # Stream tail with no newline yet
+        # Basic-format state
+        self._front = ""
+        self._back = ""
+        self._in_front = False
+        self._in_back = False
+        # Cloze-format state
+        self._content = ""
+
+    def feed(self, delta: str) -> List[Dict]:
+        """Consume a delta; return the cards it completed, in order."""
+        before = len(self.cards)
+        self._pending += delta
+        if '\n' in self._pending:
+            lines = self._pending.split('\n')
+            self._pending = lines.pop()
+            for line in lines:
+                self._feed_line(line.strip())
+        return self.cards[before:]
+
+    def _feed_line(self, line: str):
+        """Advance the state machine by one complete line"""
+        if self.is_cloze:
+            if line and _CLOZE_RE.search(line):
+                if self._content:
+                    self.cards.append({'content': self._content.strip()})
+                self._content = line
+            elif line and self._content:
+                self._content += "\n" + line
+            elif not line and self._content:
+                self.cards.append({'content': self._content.strip()})
+                self._content = ""
+        else:
+            m = _CARD_LABEL_RE.match(line)
+            if m and m.group(1).lower() == 'front':
+                if self._front and self._back:
+                    self.cards.append({'front': self._front.strip(), 'back': self._back.strip()})
+                self._front = m.group(2).strip()
+                self._back = ""
+                self._in_front = True
+                self._in_back = False
+            elif m:
+                self._back = m.group(2).strip()
+                self._in_front = False
+                self._in_back = True
+            elif line and self._in_front:
+                self._front += "\n" + line
+            elif line and self._in_back:
+                self._back += "\n" + line
+            elif not line and self._front and self._back:
+                self.cards.append({'front': self._front.strip(), 'back': self._back.strip()})
+                self._front = ""
+                self._back = ""
+                self._in_front = False
+                self._in_back = False
+
+    def partial_card(self) -> Optional[Dict]:
+        """Best-effort view of the card currently streaming, if showable"""
+        if self.is_cloze:
+            if self._content:
+                return {'content': self._content.strip()}
+        elif self._front and self._back:
+            return {'front': self._front.strip(), 'back': self._back.strip()}
+        return None
+
+    def finish(self) -> List[Dict]:
+        """Flush the trailing card after the stream ends; return all cards"""
+        if self._pending:
+            self._feed_line(self._pending.strip())
+            self._pending = ""
+        tail = self.partial_card()
+        if tail:
+            self.cards.append(tail)
+            self._content = self._front = self._back = ""
+            self._in_front = self._in_back = False
+        return self.cards
+
 class FlashcardGenerationDialog(QDialog):
     """Dialog for generating and previewing new flashcards from conversation"""
     
@@ -2279,10 +3161,27 @@ class FlashcardGenerationDialog(QDialog):
         self.conversation_text = conversation_text
         self.original_card = original_card
         self.config = config
-        self.theme_colors = get_theme_colors()
+        self.theme_colors = config_manager.theme_colors()
         self.flashcard_worker = None
+        self.summary_worker = None
+        self.refinement_workers = []
+        self._refinement_dialog = None
         self.generated_flashcards = ""
         self.conversation_summary = ""
+        self._live_cards = []
+        self._ready_cards = []
+        self.card_placeholders = []
+        self.card_editors = []  # Per-card {'front'/'back'/'content': QTextEdit}
+        self._placeholder_layout = None
+        self._placeholder_pool = []  # Detached placeholders kept for reuse
+        self._qss = _rendered_preview_qss(self.theme_colors)
+        # One shared timer animates every placeholder's loading dots;
+        # a timer per placeholder would queue N timer events on the GUI
+        # thread for the duration of the stream
+        self._dots_timer = QTimer(self)
+        self._dots_timer.setInterval(400)
+        self._dots_timer.timeout.connect(self._animate_loading_dots)
+        self._dots_phase = 0
         self.init_ui()
     
     def init_ui(self):
@@ -2329,6 +3228,12 @@ class FlashcardGenerationDialog(QDialog):
         
         self.format_combo = QComboBox()
         self.format_combo.addItems(["Basic (Front/Back)", "Cloze Deletion"])
+        # Cache the format flag; the parse/build paths test it per card
+        # and currentText() crosses into Qt on every call
+        self._is_cloze = False
+        self.format_combo.currentIndexChanged.connect(
+            lambda i: setattr(self, '_is_cloze', 'Cloze' in self.format_combo.itemText(i))
+        )
         bg_input = self.theme_colors['bg_input']
         border_color = self.theme_colors['border']
         self.format_combo.setStyleSheet(f"""
@@ -2408,10 +3313,32 @@ class FlashcardGenerationDialog(QDialog):
         """)
         layout.addWidget(generate_btn)
         
-        # Preview area
+        # Preview area header with bulk selection
+        preview_header = QHBoxLayout()
         preview_label = QLabel("📋 Preview Generated Flashcards:")
         preview_label.setStyleSheet(f"color: {text_color}; font-weight: bold; margin-top: 15px;")
-        layout.addWidget(preview_label)
+        preview_header.addWidget(preview_label)
+        preview_header.addStretch()
+
+        self.select_all_btn = QPushButton("Select All")
+        self.select_all_btn.clicked.connect(self.toggle_select_all)
+        self.select_all_btn.setStyleSheet("""
+            QPushButton {
+                background-color: transparent;
+                color: #6c5ce7;
+                border: 1px solid #6c5ce7;
+                border-radius: 4px;
+                padding: 4px 10px;
+                font-size: 11px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #6c5ce7;
+                color: white;
+            }
+        """)
+        preview_header.addWidget(self.select_all_btn)
+        layout.addLayout(preview_header)
         
         # Scroll area for card previews
         self.preview_scroll = QScrollArea()
@@ -2458,19 +3385,8 @@ class FlashcardGenerationDialog(QDialog):
         
         cancel_btn = QPushButton("Cancel")
         cancel_btn.clicked.connect(self.reject)
-        cancel_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #6c757d;
-                color: white;
-                border: none;
-                border-radius: 6px;
-                padding: 8px 16px;
-            }
-            QPushButton:hover {
-                background-color: #5a6268;
-            }
-        """)
-        
+        cancel_btn.setStyleSheet(_CANCEL_BTN_QSS)
+
         self.create_btn = QPushButton("✅ Create Cards")
         self.create_btn.clicked.connect(self.create_flashcards)
         self.create_btn.setEnabled(False)  # Disabled until generation completes
@@ -2500,7 +3416,7 @@ class FlashcardGenerationDialog(QDialog):
     def start_generation(self):
         """Start flashcard generation process"""
         # Get format selection and card count
-        card_format = "cloze" if "Cloze" in self.format_combo.currentText() else "basic"
+        card_format = "cloze" if self._is_cloze else "basic"
         custom_prompt = self.custom_prompt.text().strip()
         card_count = self.card_count_spin.value()
         
@@ -2538,11 +3454,14 @@ class FlashcardGenerationDialog(QDialog):
         self.progress_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         loading_layout.addWidget(self.progress_label)
         
-        # Placeholder cards that will fill in progressively
+        # Placeholder cards that will fill in progressively. Slot i sits
+        # at layout position i, so replacements need no layout scan
         self.card_placeholders = []
+        self._live_cards = []  # Parsed card dicts whose editor widgets are mounted
         placeholder_widget = QWidget()
         placeholder_layout = QVBoxLayout(placeholder_widget)
-        
+        self._placeholder_layout = placeholder_layout
+
         for i in range(card_count):
             placeholder = self.create_placeholder_card(i + 1)
             self.card_placeholders.append(placeholder)
@@ -2553,195 +3472,244 @@ class FlashcardGenerationDialog(QDialog):
         
         self.create_btn.setEnabled(False)
         
-        # Start worker thread
+        # Start worker thread; it parses the stream and hands back cards
+        self._ready_cards = []
+        self._streaming_started = False
+        self._dots_timer.start()
         self.flashcard_worker = FlashcardGenerationWorker(
-            self.conversation_text, 
-            self.config, 
-            custom_prompt, 
+            self.conversation_text,
+            self.config,
+            custom_prompt,
             card_format,
             card_count
         )
-        self.flashcard_worker.chunk_received.connect(self.update_progressive_preview)
+        self.flashcard_worker.card_ready.connect(self.on_card_ready)
         self.flashcard_worker.flashcards_generated.connect(self.finish_generation)
         self.flashcard_worker.error_occurred.connect(self.handle_generation_error)
         self.flashcard_worker.start()
+
+        # Generate the conversation summary in parallel so it's usually
+        # ready by the time the user finishes reviewing the preview
+        if self.summary_worker is None:
+            self.summary_worker = SummaryWorker(self.conversation_text, self.config)
+            self.summary_worker.summary_generated.connect(self.store_conversation_summary)
+            self.summary_worker.start()
+
+    @pyqtSlot(str)
+    def store_conversation_summary(self, summary: str):
+        """Store the summary generated in parallel with the flashcards"""
+        self.conversation_summary = summary.strip()
     
     def clear_preview_cards(self):
         """Clear all preview cards from the layout"""
+        # Detach un-materialized placeholders into the pool first so the
+        # next generation reuses them instead of rebuilding the trees
+        for i, widget in enumerate(self.card_placeholders):
+            if i < len(self._live_cards) and self._live_cards[i] is not None:
+                continue  # Became a real card widget; let it be deleted
+            if len(self._placeholder_pool) >= self.card_count_spin.maximum():
+                break
+            widget.hide()
+            widget.setParent(None)
+            self._placeholder_pool.append(widget)
+        self.card_placeholders = []
+
         # Clear the layout
         while self.preview_layout.count():
             child = self.preview_layout.takeAt(0)
             if child.widget():
                 child.widget().deleteLater()
         
-        # Clear checkbox list
+        # Clear checkbox list and materialized-card tracking
         self.card_checkboxes = []
+        self._live_cards = []
+        self.card_editors = []
+        self._placeholder_layout = None
     
     def create_placeholder_card(self, card_number: int) -> QWidget:
-        """Create a placeholder card that shows loading state"""
+        """Create a placeholder card, reusing a pooled one when available"""
+        if self._placeholder_pool:
+            placeholder = self._placeholder_pool.pop()
+            placeholder._header_label.setText(f"Card {card_number}")
+            placeholder.show()
+            return placeholder
+
         placeholder = QWidget()
-        bg_color = self.theme_colors['bg_input']
-        border_color = self.theme_colors['border']
-        
-        placeholder.setStyleSheet(f"""
-            QWidget {{
-                background-color: {bg_color};
-                border: 2px dashed {border_color};
-                border-radius: 10px;
-                padding: 15px;
-                min-height: 80px;
-            }}
-        """)
-        
+        placeholder.setStyleSheet(self._qss['placeholder'])
+
         layout = QVBoxLayout(placeholder)
         layout.setContentsMargins(15, 15, 15, 15)
-        
+
         # Card number and loading animation
         header = QLabel(f"Card {card_number}")
-        header.setStyleSheet(f"""
-            QLabel {{
-                color: {self.theme_colors['text_secondary']};
-                font-weight: bold;
-                font-size: 14px;
-            }}
-        """)
+        header.setStyleSheet(self._qss['placeholder_header'])
         layout.addWidget(header)
-        
-        # Loading dots animation
+        placeholder._header_label = header  # For resetting pooled widgets
+
+        # Loading dots animation, driven by the shared dialog timer
         loading_dots = QLabel("● ● ●")
-        loading_dots.setStyleSheet(f"""
-            QLabel {{
-                color: {self.theme_colors['text_secondary']};
-                font-size: 12px;
-                text-align: center;
-            }}
-        """)
+        loading_dots.setStyleSheet(self._qss['loading_dots'])
         loading_dots.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(loading_dots)
-        
+        placeholder._dots_label = loading_dots
+
         return placeholder
 
-    def update_progressive_preview(self, text: str):
-        """Update preview with progressive card loading as they're generated"""
-        # Update progress label
-        if hasattr(self, 'progress_label'):
-            self.progress_label.setText("🧠 AI is generating flashcards...")
-        
-        # Try to parse partial cards and update placeholders
-        try:
-            partial_cards = self.parse_flashcards(text)
-            
-            # Update placeholders with actual card content as they become available
-            for i, card in enumerate(partial_cards):
-                if i < len(self.card_placeholders):
-                    # Replace placeholder with actual card preview
-                    self.replace_placeholder_with_card(i, card)
-                    
-        except Exception:
-            # If parsing fails, just continue with loading animation
-            pass
+    def _animate_loading_dots(self):
+        """Advance the shared loading animation on all pending placeholders"""
+        self._dots_phase = (self._dots_phase + 1) % 3
+        text = "● " * (self._dots_phase + 1)
+        for i, widget in enumerate(self.card_placeholders):
+            if i < len(self._live_cards) and self._live_cards[i] is not None:
+                continue  # Already a real card
+            label = getattr(widget, '_dots_label', None)
+            if label is not None:
+                label.setText(text.rstrip())
+
+    @pyqtSlot(int, dict)
+    def on_card_ready(self, index: int, card: dict):
+        """Show a card the worker parsed, complete or still streaming.
+
+        The worker re-emits the same index as a streaming card grows and
+        once more when it completes; the slot either materializes the
+        widget or refreshes its text in place."""
+        # Flip the progress label once on the first card activity;
+        # rewriting it per tick forces a needless repaint
+        if not self._streaming_started:
+            self._streaming_started = True
+            if hasattr(self, 'progress_label'):
+                self.progress_label.setText("🧠 AI is generating flashcards...")
+
+        while len(self._ready_cards) <= index:
+            self._ready_cards.append(None)
+        self._ready_cards[index] = card
+
+        self.replace_placeholder_with_card(index, card)
 
     def replace_placeholder_with_card(self, index: int, flashcard: dict):
-        """Replace a placeholder with actual card content"""
+        """Show a parsed card at the given slot, building its widget at most once.
+
+        Streaming re-parses deliver the same leading cards on every delta;
+        rebuilding their editor widgets each time repaints the entire
+        preview per tick. Slots that are already materialized just get
+        their text refreshed in place."""
         if index >= len(self.card_placeholders):
             return
-            
-        # Create new card widget
+
+        if index < len(self._live_cards) and self._live_cards[index] is not None:
+            self._refresh_card_widget(self._live_cards[index], flashcard)
+            return
+
+        # First completion of this card: build its widget and swap it in
+        # at the recorded slot position — no layout scan needed
         card_widget = self.create_card_preview_widget(flashcard, index)
-        
-        # Replace the placeholder in the layout
+
         placeholder = self.card_placeholders[index]
-        layout = placeholder.parent().layout()
-        
-        if layout:
-            # Find the position of the placeholder
-            for i in range(layout.count()):
-                if layout.itemAt(i).widget() == placeholder:
-                    # Remove placeholder and insert card widget
-                    layout.removeWidget(placeholder)
-                    placeholder.deleteLater()
-                    layout.insertWidget(i, card_widget)
-                    self.card_placeholders[index] = card_widget
-                    break
+        layout = self._placeholder_layout
+
+        if layout is not None:
+            layout.removeWidget(placeholder)
+            placeholder.deleteLater()
+            layout.insertWidget(index, card_widget)
+            self.card_placeholders[index] = card_widget
+
+        while len(self._live_cards) <= index:
+            self._live_cards.append(None)
+        self._live_cards[index] = flashcard  # Carries the *_widget references
+
+    def _refresh_card_widget(self, live: dict, flashcard: dict):
+        """Push changed text into a materialized card's editors.
+
+        Leaves an editor alone while the user has it focused so streaming
+        refreshes never clobber an in-progress manual edit."""
+        for key, widget_key in (('content', 'content_widget'),
+                                ('front', 'front_widget'),
+                                ('back', 'back_widget')):
+            widget = live.get(widget_key)
+            if widget is None:
+                continue
+            new_text = flashcard.get(key, '')
+            if new_text != live.get(key, '') and not widget.hasFocus():
+                widget.setPlainText(new_text)
+                live[key] = new_text
     
+    @pyqtSlot(str)
     def finish_generation(self, final_text: str):
-        """Finish generation and create individual card previews"""
+        """Finish generation and reconcile the preview with the final parse.
+
+        Streaming already materialized a widget per completed card, so
+        rather than tearing the whole preview down and rebuilding it,
+        this takes the worker-parsed card list, refreshes or fills each
+        slot, and retires leftover placeholders."""
         self.generated_flashcards = final_text
-        
-        # Clear the generating message
-        self.clear_preview_cards()
-        
-        # Parse the flashcards
-        flashcards = self.parse_flashcards(final_text)
-        
+        self._dots_timer.stop()
+
+        # The worker's parser already delivered every card via card_ready
+        flashcards = [card for card in self._ready_cards if card is not None]
+
         if not flashcards:
+            self.clear_preview_cards()
             error_label = QLabel("❌ Could not parse any valid flashcards from the generated content.")
             error_label.setStyleSheet(f"color: red; padding: 20px; text-align: center;")
             error_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
             self.preview_layout.addWidget(error_label)
             return
-        
-        # Create individual preview cards
-        for i, flashcard in enumerate(flashcards):
-            card_widget = self.create_card_preview_widget(flashcard, i)
-            self.preview_layout.addWidget(card_widget)
-        
-        # Add stretch at the end
-        self.preview_layout.addStretch()
-        
+
+        # One relayout/repaint for the whole reconciliation pass
+        self.preview_container.setUpdatesEnabled(False)
+        try:
+            # Retire the streaming header labels
+            if hasattr(self, 'loading_label'):
+                self.loading_label.hide()
+            if hasattr(self, 'progress_label'):
+                self.progress_label.hide()
+
+            # Fill slots that never completed during streaming and
+            # refresh the ones that did
+            for i, flashcard in enumerate(flashcards):
+                if i < len(self.card_placeholders):
+                    self.replace_placeholder_with_card(i, flashcard)
+
+            # The model may return more cards than requested slots
+            if self._placeholder_layout is not None and len(flashcards) > len(self.card_placeholders):
+                extra_layout = self._placeholder_layout
+                for i in range(len(self.card_placeholders), len(flashcards)):
+                    card_widget = self.create_card_preview_widget(flashcards[i], i)
+                    extra_layout.addWidget(card_widget)
+                    self.card_placeholders.append(card_widget)
+                    while len(self._live_cards) <= i:
+                        self._live_cards.append(None)
+                    self._live_cards[i] = flashcards[i]
+
+            # ...or fewer: drop placeholders that never got a card
+            for i in range(len(flashcards), len(self.card_placeholders)):
+                if i >= len(self._live_cards) or self._live_cards[i] is None:
+                    self.card_placeholders[i].hide()
+        finally:
+            self.preview_container.setUpdatesEnabled(True)
+
         # Enable create button
         self.create_btn.setEnabled(True)
-        
+
         # Update button text to show selection
         self.update_create_button_text()
     
     def create_card_preview_widget(self, flashcard: dict, index: int) -> QWidget:
         """Create a preview widget for a single flashcard"""
         card_widget = QWidget()
-        bg_color = self.theme_colors['bg_main']
-        border_color = self.theme_colors['border']
-        text_color = self.theme_colors['text_primary']
-        
-        card_widget.setStyleSheet(f"""
-            QWidget {{
-                background-color: {bg_color};
-                border: 2px solid {border_color};
-                border-radius: 10px;
-                padding: 5px;
-            }}
-        """)
-        
+        card_widget.setStyleSheet(self._qss['card_widget'])
+
         layout = QVBoxLayout(card_widget)
         layout.setContentsMargins(15, 15, 15, 15)
         layout.setSpacing(10)
-        
+
         # Header with checkbox, card number, and refine button
         header_layout = QHBoxLayout()
-        
+
         # Checkbox for selection
         checkbox = QCheckBox(f"Card {index + 1}")
         checkbox.setChecked(False)  # Default to NOT selected
-        checkbox.setStyleSheet(f"""
-            QCheckBox {{
-                color: {text_color};
-                font-weight: bold;
-                font-size: 14px;
-            }}
-            QCheckBox::indicator {{
-                width: 18px;
-                height: 18px;
-            }}
-            QCheckBox::indicator:unchecked {{
-                border: 2px solid {border_color};
-                background-color: {bg_color};
-                border-radius: 3px;
-            }}
-            QCheckBox::indicator:checked {{
-                border: 2px solid #28a745;
-                background-color: #28a745;
-                border-radius: 3px;
-            }}
-        """)
+        checkbox.setStyleSheet(self._qss['card_checkbox'])
         checkbox.stateChanged.connect(self.update_create_button_text)
         self.card_checkboxes.append(checkbox)
         
@@ -2750,97 +3718,72 @@ class FlashcardGenerationDialog(QDialog):
         
         # Refine button
         refine_btn = QPushButton("🔧 Refine")
-        refine_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #17a2b8;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                padding: 4px 8px;
-                font-size: 11px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #138496;
-            }
-        """)
+        refine_btn.setStyleSheet(_REFINE_BTN_QSS)
         refine_btn.clicked.connect(lambda: self.refine_card(index))
         header_layout.addWidget(refine_btn)
         
         layout.addLayout(header_layout)
         
         # Card content with editable fields
-        if "cloze" in self.format_combo.currentText().lower():
+        if self._is_cloze:
             # Cloze card content
             content_label = QLabel("<b>Cloze Text:</b> <i>(double-click to edit)</i>")
-            content_label.setStyleSheet(f"color: #6c5ce7; font-weight: bold;")
+            content_label.setStyleSheet(_CARD_FIELD_LABEL_QSS)
             layout.addWidget(content_label)
-            
+
             content_text = QTextEdit(flashcard['content'])
             content_text.setMaximumHeight(80)
-            content_text.setStyleSheet(f"""
-                QTextEdit {{
-                    color: {text_color};
-                    background-color: {self.theme_colors['bg_input']};
-                    border-radius: 6px;
-                    border: 1px solid {border_color};
-                    font-size: 13px;
-                    padding: 8px;
-                }}
-            """)
+            content_text.setStyleSheet(self._qss['card_textedit'])
             # Store reference for access during card creation
             flashcard['content_widget'] = content_text
+            editors = {'content': content_text}
             layout.addWidget(content_text)
         else:
             # Basic card content
             front_label = QLabel("<b>Front:</b> <i>(double-click to edit)</i>")
-            front_label.setStyleSheet(f"color: #6c5ce7; font-weight: bold;")
+            front_label.setStyleSheet(_CARD_FIELD_LABEL_QSS)
             layout.addWidget(front_label)
-            
+
             front_text = QTextEdit(flashcard['front'])
             front_text.setMaximumHeight(60)
-            front_text.setStyleSheet(f"""
-                QTextEdit {{
-                    color: {text_color};
-                    background-color: {self.theme_colors['bg_input']};
-                    border-radius: 6px;
-                    border: 1px solid {border_color};
-                    font-size: 13px;
-                    padding: 8px;
-                }}
-            """)
+            front_text.setStyleSheet(self._qss['card_textedit'])
             # Store reference for access during card creation
             flashcard['front_widget'] = front_text
             layout.addWidget(front_text)
-            
+
             back_label = QLabel("<b>Back:</b> <i>(double-click to edit)</i>")
-            back_label.setStyleSheet(f"color: #6c5ce7; font-weight: bold; margin-top: 8px;")
+            back_label.setStyleSheet(_CARD_FIELD_LABEL_QSS + " margin-top: 8px;")
             layout.addWidget(back_label)
-            
+
             back_text = QTextEdit(flashcard['back'])
             back_text.setMaximumHeight(80)
-            back_text.setStyleSheet(f"""
-                QTextEdit {{
-                    color: {text_color};
-                    background-color: {self.theme_colors['bg_input']};
-                    border-radius: 6px;
-                    border: 1px solid {border_color};
-                    font-size: 13px;
-                    padding: 8px;
-                }}
-            """)
+            back_text.setStyleSheet(self._qss['card_textedit'])
             # Store reference for access during card creation
             flashcard['back_widget'] = back_text
+            editors = {'front': front_text, 'back': back_text}
             layout.addWidget(back_text)
-        
+
+        # Index the editors so later lookups are O(1) instead of a
+        # findChildren() walk over the widget tree
+        while len(self.card_editors) <= index:
+            self.card_editors.append(None)
+        self.card_editors[index] = editors
+
         return card_widget
     
     def refine_card(self, card_index: int):
         """Open refinement dialog for a specific card"""
         if card_index >= len(self.card_checkboxes):
             return
-            
-        dialog = CardRefinementDialog(self, card_index, self.config)
+
+        # Reuse one dialog across opens instead of rebuilding its widgets
+        # and re-parsing the stylesheets on every ✨ click
+        dialog = self._refinement_dialog
+        if dialog is None:
+            dialog = CardRefinementDialog(self, card_index, self.config)
+            self._refinement_dialog = dialog
+        else:
+            dialog.set_card_index(card_index)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             # Get the refinement prompt
             refinement_prompt = dialog.get_refinement_prompt()
@@ -2856,80 +3799,80 @@ class FlashcardGenerationDialog(QDialog):
             return
             
         current_card = flashcards[card_index]
-        
-        # Create refinement worker
-        self.refinement_worker = CardRefinementWorker(
-            current_card, refinement_prompt, self.config, 
-            "cloze" if "Cloze" in self.format_combo.currentText() else "basic"
+
+        # Create refinement worker; keep every in-flight worker referenced so
+        # refining a second card doesn't drop the first thread mid-request
+        worker = CardRefinementWorker(
+            current_card, refinement_prompt, self.config,
+            "cloze" if self._is_cloze else "basic"
         )
-        self.refinement_worker.refinement_complete.connect(
+        worker.refinement_complete.connect(
             lambda refined_content: self.update_card_content(card_index, refined_content)
         )
-        self.refinement_worker.error_occurred.connect(
+        worker.error_occurred.connect(
             lambda error: showWarning(f"Refinement failed: {error}")
         )
-        self.refinement_worker.start()
+        worker.finished.connect(
+            lambda w=worker: self.refinement_workers.remove(w)
+        )
+        self.refinement_workers.append(worker)
+        worker.start()
     
     def update_card_content(self, card_index: int, refined_content: str):
         """Update the card content with refined version"""
-        # Find the card widget and update its content
-        card_widget = self.preview_layout.itemAt(card_index).widget()
-        if not card_widget:
+        # Look up the card's editors directly instead of walking the tree
+        if card_index >= len(self.card_editors) or not self.card_editors[card_index]:
             return
-            
+        editors = self.card_editors[card_index]
+
         # Parse the refined content
         refined_card = self.parse_single_card(refined_content)
         if not refined_card:
             return
-            
+
         # Update the text fields in the card widget
-        if "cloze" in self.format_combo.currentText().lower():
-            # Find and update cloze content
-            for child in card_widget.findChildren(QTextEdit):
-                if hasattr(child, 'toPlainText'):
-                    child.setPlainText(refined_card.get('content', ''))
-                    break
+        if 'content' in editors:
+            editors['content'].setPlainText(refined_card.get('content', ''))
         else:
-            # Find and update front/back content
-            text_edits = card_widget.findChildren(QTextEdit)
-            if len(text_edits) >= 2:
-                text_edits[0].setPlainText(refined_card.get('front', ''))  # Front
-                text_edits[1].setPlainText(refined_card.get('back', ''))   # Back
+            editors['front'].setPlainText(refined_card.get('front', ''))
+            editors['back'].setPlainText(refined_card.get('back', ''))
     
     def parse_single_card(self, text: str) -> dict:
         """Parse a single refined card"""
-        if "cloze" in self.format_combo.currentText().lower():
+        if self._is_cloze:
             return {'content': text.strip()}
-        else:
-            # Try to parse front/back
-            lines = text.split('\n')
-            front = ""
-            back = ""
-            in_front = False
-            in_back = False
-            
-            for line in lines:
-                line = line.strip()
-                if line.lower().startswith('front:'):
-                    front = line[6:].strip()
-                    in_front = True
-                    in_back = False
-                elif line.lower().startswith('back:'):
-                    back = line[5:].strip()
-                    in_front = False
-                    in_back = True
-                elif line and in_front:
-                    front += "\n" + line
-                elif line and in_back:
-                    back += "\n" + line
-            
-            # If no front/back structure, treat as front only
-            if not front and not back:
-                front = text.strip()
-                back = "[Refined content - please add back]"
-                
-            return {'front': front, 'back': back}
+
+        # One compiled-regex sweep instead of a per-line Python scan
+        sections = {m.group(1).lower(): m.group(2).strip()
+                    for m in _CARD_SECTION_RE.finditer(text)}
+        front = sections.get('front', '')
+        back = sections.get('back', '')
+
+        # If no front/back structure, treat as front only
+        if not front and not back:
+            front = text.strip()
+            back = "[Refined content - please add back]"
+
+        return {'front': front, 'back': back}
     
+    def toggle_select_all(self):
+        """Check or clear every card with a single button-text update.
+
+        Each checkbox toggle normally fires update_create_button_text;
+        blocking signals during the sweep collapses N slot invocations
+        (and N repaints of the create button) into one."""
+        if not self.card_checkboxes:
+            return
+
+        select = any(not cb.isChecked() for cb in self.card_checkboxes)
+        for cb in self.card_checkboxes:
+            cb.blockSignals(True)
+            cb.setChecked(select)
+            cb.blockSignals(False)
+
+        self.select_all_btn.setText("Select None" if select else "Select All")
+        self.update_create_button_text()
+
     def update_create_button_text(self):
         """Update the create button text to show how many cards are selected"""
         selected_count = sum(1 for cb in self.card_checkboxes if cb.isChecked())
@@ -2945,8 +3888,10 @@ class FlashcardGenerationDialog(QDialog):
             self.create_btn.setText(f"✅ Create {selected_count} of {total_count} Cards")
             self.create_btn.setEnabled(True)
     
+    @pyqtSlot(str)
     def handle_generation_error(self, error_message: str):
         """Handle generation errors"""
+        self._dots_timer.stop()
         self.clear_preview_cards()
         error_label = QLabel(f"❌ Error generating flashcards: {error_message}")
         error_label.setStyleSheet(f"color: red; padding: 20px; text-align: center;")
@@ -2963,11 +3908,9 @@ class FlashcardGenerationDialog(QDialog):
         original_text = self.create_btn.text()
         self.create_btn.setText("⏳ Creating cards...")
         self.create_btn.setEnabled(False)
-        
-        # Process application events to show the button change
+
         from aqt.qt import QApplication
-        QApplication.processEvents()
-        
+
         try:
             from aqt import mw
             
@@ -2976,7 +3919,7 @@ class FlashcardGenerationDialog(QDialog):
             deck_id = self.original_card.did
             
             # Get or create the appropriate note type for this addon
-            card_format = "cloze" if "cloze" in self.format_combo.currentText().lower() else "basic"
+            card_format = "cloze" if self._is_cloze else "basic"
             
             # Update button to show progress
             self.create_btn.setText("⏳ Setting up note type...")
@@ -2984,11 +3927,15 @@ class FlashcardGenerationDialog(QDialog):
             
             note_type = self.get_or_create_addon_note_type(card_format)
             
-            # Generate conversation summary for each card
-            self.create_btn.setText("⏳ Generating summary...")
-            QApplication.processEvents()
-            
-            self.generate_conversation_summary_sync()
+            # Use the summary generated in parallel with the cards; only
+            # wait if it hasn't arrived yet
+            if not self.conversation_summary and self.summary_worker is not None:
+                self.create_btn.setText("⏳ Generating summary...")
+                QApplication.processEvents()
+                self.summary_worker.wait(15000)
+                self.conversation_summary = self.summary_worker.accumulated_text.strip()
+            if not self.conversation_summary:
+                self.generate_conversation_summary_sync()
             
             # Parse the generated flashcards
             flashcards = self.parse_flashcards(self.generated_flashcards)
@@ -3003,13 +3950,8 @@ class FlashcardGenerationDialog(QDialog):
             selected_flashcards = []
             for i, flashcard in enumerate(flashcards):
                 if i < len(self.card_checkboxes) and self.card_checkboxes[i].isChecked():
-                    # Get current content from the editable fields
-                    card_widget = self.preview_layout.itemAt(i).widget()
-                    if card_widget:
-                        edited_card = self.get_current_card_content(card_widget, flashcard)
-                        selected_flashcards.append(edited_card)
-                    else:
-                        selected_flashcards.append(flashcard)
+                    # Get current content from the cached editable fields
+                    selected_flashcards.append(self.get_current_card_content(i, flashcard))
             
             if not selected_flashcards:
                 self.create_btn.setText(original_text)
@@ -3017,289 +3959,110 @@ class FlashcardGenerationDialog(QDialog):
                 showWarning("No flashcards selected for creation!")
                 return
             
-            # Create each selected flashcard with progress updates
-            created_count = 0
+            # Build every note first, then insert them in one tight pass
             total_selected = len(selected_flashcards)
-            
-            for i, flashcard in enumerate(selected_flashcards):
-                try:
-                    # Update progress
-                    self.create_btn.setText(f"⏳ Creating card {i+1}/{total_selected}...")
-                    QApplication.processEvents()
-                    
-                    # Create new note
-                    note = mw.col.new_note(note_type)
-                    
-                    # Copy tags from original card
-                    note.tags = original_note.tags.copy()
-                    
-                    # Set the main content based on card format and note type structure
-                    if "cloze" in self.format_combo.currentText().lower():
-                        # For AI Chat Cloze: Text, Extra, AI Conversation Summary
-                        note.fields[0] = flashcard['content']  # Text field
-                        note.fields[1] = ""  # Extra field (empty for now)
-                        note.fields[2] = self.conversation_summary  # AI Conversation Summary
-                    else:
-                        # For AI Chat Basic: Front, Back, AI Conversation Summary
-                        note.fields[0] = flashcard['front']  # Front field
-                        note.fields[1] = flashcard['back']   # Back field
-                        note.fields[2] = self.conversation_summary  # AI Conversation Summary
-                    
-                    # Add note to collection
-                    mw.col.add_note(note, deck_id)
-                    created_count += 1
-                    
-                except Exception as e:
-                    print(f"Error creating flashcard: {e}")
-                    continue
-            
-            # Final save
-            self.create_btn.setText("⏳ Saving to Anki...")
-            QApplication.processEvents()
-            
-            if created_count > 0:
-                # Save changes and refresh
-                mw.col.save()
-                mw.requireReset()
-                
+            self.create_btn.setText(f"⏳ Creating {total_selected} card(s)...")
+
+            new_notes = []
+            base_tags = list(original_note.tags)
+            for flashcard in selected_flashcards:
+                note = mw.col.new_note(note_type)
+
+                # Copy tags from original card
+                note.tags = base_tags[:]
+
+                # Set the main content based on card format and note type structure
+                if card_format == "cloze":
+                    # For AI Chat Cloze: Text, Extra, AI Conversation Summary
+                    note.fields[0] = flashcard['content']  # Text field
+                    note.fields[1] = ""  # Extra field (empty for now)
+                    note.fields[2] = self.conversation_summary  # AI Conversation Summary
+                else:
+                    # For AI Chat Basic: Front, Back, AI Conversation Summary
+                    note.fields[0] = flashcard['front']  # Front field
+                    note.fields[1] = flashcard['back']   # Back field
+                    note.fields[2] = self.conversation_summary  # AI Conversation Summary
+
+                new_notes.append(note)
+
+            # Insert on a background thread through Anki's CollectionOp:
+            # the backend batches the adds, refreshes the UI itself (no
+            # requireReset) and the event loop keeps running without any
+            # processEvents pumping
+            from aqt.operations import CollectionOp
+
+            created = []
+
+            def add_notes_op(col):
+                # Merge the whole batch into one undo entry so the backend
+                # treats it as a single operation instead of N separate ones
+                pos = col.add_custom_undo_entry(
+                    f"Create {len(new_notes)} AI flashcard(s)"
+                )
+                for note in new_notes:
+                    try:
+                        col.add_note(note, deck_id)
+                        created.append(note)
+                    except Exception as e:
+                        print(f"Error creating flashcard: {e}")
+                if not created:
+                    raise Exception("Please check your note type fields.")
+                return col.merge_undo_entries(pos)
+
+            def on_notes_added(_changes):
                 # Success animation
                 self.create_btn.setText("✅ Success!")
-                self.create_btn.setStyleSheet("""
-                    QPushButton {
-                        background-color: #28a745;
-                        color: white;
-                        border: none;
-                        border-radius: 6px;
-                        padding: 8px 16px;
-                        font-weight: bold;
-                    }
-                """)
-                QApplication.processEvents()
-                
-                showInfo(f"Successfully created {created_count} flashcard(s)!")
+                showInfo(f"Successfully created {len(created)} flashcard(s)!")
                 self.accept()
-            else:
+
+            def on_add_failed(exc):
                 self.create_btn.setText(original_text)
                 self.create_btn.setEnabled(True)
-                showWarning("Failed to create any flashcards. Please check your note type fields.")
-                
+                showWarning(f"Failed to create flashcards: {exc}")
+
+            CollectionOp(parent=self, op=add_notes_op) \
+                .success(on_notes_added) \
+                .failure(on_add_failed) \
+                .run_in_background()
+
         except Exception as e:
             self.create_btn.setText(original_text)
             self.create_btn.setEnabled(True)
             showWarning(f"Error creating flashcards: {str(e)}")
     
-    def get_current_card_content(self, card_widget: QWidget, original_card: dict) -> dict:
-        """Get the current content from editable fields in a card widget"""
-        if "cloze" in self.format_combo.currentText().lower():
-            # Find the cloze content text edit
-            for child in card_widget.findChildren(QTextEdit):
-                if hasattr(child, 'toPlainText'):
-                    return {'content': child.toPlainText()}
-            return original_card
-        else:
-            # Find front and back text edits
-            text_edits = card_widget.findChildren(QTextEdit)
-            if len(text_edits) >= 2:
-                return {
-                    'front': text_edits[0].toPlainText(),
-                    'back': text_edits[1].toPlainText()
-                }
+    def get_current_card_content(self, card_index: int, original_card: dict) -> dict:
+        """Get the current content from a card's editable fields"""
+        if card_index >= len(self.card_editors) or not self.card_editors[card_index]:
             return original_card
+        editors = self.card_editors[card_index]
+
+        if 'content' in editors:
+            return {'content': editors['content'].toPlainText()}
+        return {
+            'front': editors['front'].toPlainText(),
+            'back': editors['back'].toPlainText()
+        }
     
     def update_existing_template(self, note_type, card_format: str):
         """Update existing note type template with AnKing-style conversation summary button"""
         from aqt import mw
-        
+
         if not note_type['tmpls']:
             return
-            
-        template = note_type['tmpls'][0]  # Get the first (and usually only) template
-        
-        if card_format == "cloze":
-            template['afmt'] = """{{cloze:Text}}<br>{{Extra}}
-
-{{#AI Conversation Summary}}
-<span id="hint-ai-summary" class="hintBtn" data-name="AI Conversation Summary">
-  <a href="#" class="hint" onclick="toggleHintBtn('hint-ai-summary')"></a>
-  <button id="button-ai-summary" class="button-general" onclick="toggleHintBtn('hint-ai-summary')">
-    💬 AI Chat Summary
-  </button>
-  <div dir="auto" id="ai-summary" class="hints" style="display: none;">{{AI Conversation Summary}}</div>
-</span>
-
-<script>
-// AnKing-style toggle function for AI Chat Summary
-window.toggleHintBtn = function(containerId, noScrolling=false) {
-  const container = document.getElementById(containerId)
-  const link = container.getElementsByTagName("a")[0]
-  const button = container.getElementsByTagName("button")[0]
-  const hint = container.getElementsByTagName("div")[0]
-
-  if (hint.style.display == "none") {
-    button.classList.add("expanded-button")
-    hint.style.display = "block"
-    link.style.display = "none"
-    if (!noScrolling) {
-      hint.scrollIntoView({
-        behavior: "smooth",
-        block: "start",
-        inline: "nearest"
-      });
-    }
-  } else {
-    button.classList.remove("expanded-button")
-    hint.style.display = "none"
-    link.style.display = ""
-  }
-}
-
-// AnKing-style button styling
-const style = document.createElement('style');
-style.textContent = `
-.button-general {
-  outline: 0;
-  border-radius: 0.12em;
-  border: 1px solid #525253 !important;
-  padding: 5px 5px;
-  text-align: center;
-  display: inline-block;
-  font-size: 9.5px;
-  background-color: #424242;
-  color: #AFAFAF !important;
-  margin-top: 8px;
-}
-
-.expanded-button {
-  display: block;
-  margin: auto;
-  margin-top: 10px;
-  font-weight: bold;
-  width: 50% !important;
-  background: #ababab !important;
-  color: black !important;
-  font-weight: bold;
-  width: 50% !important;
-}
 
-.hints {
-  font-style: italic;
-  font-size: 1.2rem;
-  color: #4297F9;
-}
-
-html:not(.mobile) .button-general:hover {
-  cursor: default;
-  background-color: #E9E9E9 !important;
-  color: #363638 !important;
-}
-
-/* Night mode styles */
-.nightMode .hints, .night_mode .hints {
-  color: cyan;
-}
-
-.nightMode .card, .night_mode .card {
-  background-color: #272828 !important;
-  color: #FFFAFA !important;
-}
-`;
-document.head.appendChild(style);
-</script>
-{{/AI Conversation Summary}}"""
-        else:  # basic
-            template['afmt'] = """{{FrontSide}}<hr id="answer">{{Back}}
-
-{{#AI Conversation Summary}}
-<span id="hint-ai-summary" class="hintBtn" data-name="AI Conversation Summary">
-  <a href="#" class="hint" onclick="toggleHintBtn('hint-ai-summary')"></a>
-  <button id="button-ai-summary" class="button-general" onclick="toggleHintBtn('hint-ai-summary')">
-    💬 AI Chat Summary
-  </button>
-  <div dir="auto" id="ai-summary" class="hints" style="display: none;">{{AI Conversation Summary}}</div>
-</span>
-
-<script>
-// AnKing-style toggle function for AI Chat Summary
-window.toggleHintBtn = function(containerId, noScrolling=false) {
-  const container = document.getElementById(containerId)
-  const link = container.getElementsByTagName("a")[0]
-  const button = container.getElementsByTagName("button")[0]
-  const hint = container.getElementsByTagName("div")[0]
-
-  if (hint.style.display == "none") {
-    button.classList.add("expanded-button")
-    hint.style.display = "block"
-    link.style.display = "none"
-    if (!noScrolling) {
-      hint.scrollIntoView({
-        behavior: "smooth",
-        block: "start",
-        inline: "nearest"
-      });
-    }
-  } else {
-    button.classList.remove("expanded-button")
-    hint.style.display = "none"
-    link.style.display = ""
-  }
-}
-
-// AnKing-style button styling
-const style = document.createElement('style');
-style.textContent = `
-.button-general {
-  outline: 0;
-  border-radius: 0.12em;
-  border: 1px solid #525253 !important;
-  padding: 5px 5px;
-  text-align: center;
-  display: inline-block;
-  font-size: 9.5px;
-  background-color: #424242;
-  color: #AFAFAF !important;
-  margin-top: 8px;
-}
-
-.expanded-button {
-  display: block;
-  margin: auto;
-  margin-top: 10px;
-  font-weight: bold;
-  width: 50% !important;
-  background: #ababab !important;
-  color: black !important;
-  font-weight: bold;
-  width: 50% !important;
-}
-
-.hints {
-  font-style: italic;
-  font-size: 1.2rem;
-  color: #4297F9;
-}
+        # Checked once per session; afterwards the dialog open skips even
+        # the template comparison
+        if note_type['id'] in _TEMPLATE_FRESH:
+            return
 
-html:not(.mobile) .button-general:hover {
-  cursor: default;
-  background-color: #E9E9E9 !important;
-  color: #363638 !important;
-}
+        template = note_type['tmpls'][0]  # Get the first (and usually only) template
+        expected_afmt = _CLOZE_AFMT if card_format == "cloze" else _BASIC_AFMT
 
-/* Night mode styles */
-.nightMode .hints, .night_mode .hints {
-  color: cyan;
-}
+        if template['afmt'] != expected_afmt:
+            template['afmt'] = expected_afmt
+            mw.col.models.save(note_type)
 
-.nightMode .card, .night_mode .card {
-  background-color: #272828 !important;
-  color: #FFFAFA !important;
-}
-`;
-document.head.appendChild(style);
-</script>
-{{/AI Conversation Summary}}"""
-        
-        # Save the changes
-        mw.col.models.save(note_type)
+        _TEMPLATE_FRESH.add(note_type['id'])
 
     def get_or_create_addon_note_type(self, card_format: str):
         """Get or create the appropriate note type for AI-generated cards"""
@@ -3331,96 +4094,7 @@ document.head.appendChild(style);
             # Add cloze template with AnKing-style conversation summary button
             template = mw.col.models.new_template("Cloze")
             template['qfmt'] = "{{cloze:Text}}"
-            template['afmt'] = """{{cloze:Text}}<br>{{Extra}}
-
-{{#AI Conversation Summary}}
-<span id="hint-ai-summary" class="hintBtn" data-name="AI Conversation Summary">
-  <a href="#" class="hint" onclick="toggleHintBtn('hint-ai-summary')"></a>
-  <button id="button-ai-summary" class="button-general" onclick="toggleHintBtn('hint-ai-summary')">
-    💬 AI Chat Summary
-  </button>
-  <div dir="auto" id="ai-summary" class="hints" style="display: none;">{{AI Conversation Summary}}</div>
-</span>
-
-<script>
-// AnKing-style toggle function for AI Chat Summary
-window.toggleHintBtn = function(containerId, noScrolling=false) {
-  const container = document.getElementById(containerId)
-  const link = container.getElementsByTagName("a")[0]
-  const button = container.getElementsByTagName("button")[0]
-  const hint = container.getElementsByTagName("div")[0]
-
-  if (hint.style.display == "none") {
-    button.classList.add("expanded-button")
-    hint.style.display = "block"
-    link.style.display = "none"
-    if (!noScrolling) {
-      hint.scrollIntoView({
-        behavior: "smooth",
-        block: "start",
-        inline: "nearest"
-      });
-    }
-  } else {
-    button.classList.remove("expanded-button")
-    hint.style.display = "none"
-    link.style.display = ""
-  }
-}
-
-// AnKing-style button styling
-const style = document.createElement('style');
-style.textContent = `
-.button-general {
-  outline: 0;
-  border-radius: 0.12em;
-  border: 1px solid #525253 !important;
-  padding: 5px 5px;
-  text-align: center;
-  display: inline-block;
-  font-size: 9.5px;
-  background-color: #424242;
-  color: #AFAFAF !important;
-  margin-top: 8px;
-}
-
-.expanded-button {
-  display: block;
-  margin: auto;
-  margin-top: 10px;
-  font-weight: bold;
-  width: 50% !important;
-  background: #ababab !important;
-  color: black !important;
-  font-weight: bold;
-  width: 50% !important;
-}
-
-.hints {
-  font-style: italic;
-  font-size: 1.2rem;
-  color: #4297F9;
-}
-
-html:not(.mobile) .button-general:hover {
-  cursor: default;
-  background-color: #E9E9E9 !important;
-  color: #363638 !important;
-}
-
-/* Night mode styles */
-.nightMode .hints, .night_mode .hints {
-  color: cyan;
-}
-
-.nightMode .card, .night_mode .card {
-  background-color: #272828 !important;
-  color: #FFFAFA !important;
-}
-`;
-document.head.appendChild(style);
-</script>
-{{/AI Conversation Summary}}"""
+            template['afmt'] = _CLOZE_AFMT
             mw.col.models.add_template(note_type, template)
             
             # Save the model
@@ -3453,96 +4127,7 @@ document.head.appendChild(style);
             # Add card template with AnKing-style conversation summary button
             template = mw.col.models.new_template("Card 1")
             template['qfmt'] = "{{Front}}"
-            template['afmt'] = """{{FrontSide}}<hr id="answer">{{Back}}
-
-{{#AI Conversation Summary}}
-<span id="hint-ai-summary" class="hintBtn" data-name="AI Conversation Summary">
-  <a href="#" class="hint" onclick="toggleHintBtn('hint-ai-summary')"></a>
-  <button id="button-ai-summary" class="button-general" onclick="toggleHintBtn('hint-ai-summary')">
-    💬 AI Chat Summary
-  </button>
-  <div dir="auto" id="ai-summary" class="hints" style="display: none;">{{AI Conversation Summary}}</div>
-</span>
-
-<script>
-// AnKing-style toggle function for AI Chat Summary
-window.toggleHintBtn = function(containerId, noScrolling=false) {
-  const container = document.getElementById(containerId)
-  const link = container.getElementsByTagName("a")[0]
-  const button = container.getElementsByTagName("button")[0]
-  const hint = container.getElementsByTagName("div")[0]
-
-  if (hint.style.display == "none") {
-    button.classList.add("expanded-button")
-    hint.style.display = "block"
-    link.style.display = "none"
-    if (!noScrolling) {
-      hint.scrollIntoView({
-        behavior: "smooth",
-        block: "start",
-        inline: "nearest"
-      });
-    }
-  } else {
-    button.classList.remove("expanded-button")
-    hint.style.display = "none"
-    link.style.display = ""
-  }
-}
-
-// AnKing-style button styling
-const style = document.createElement('style');
-style.textContent = `
-.button-general {
-  outline: 0;
-  border-radius: 0.12em;
-  border: 1px solid #525253 !important;
-  padding: 5px 5px;
-  text-align: center;
-  display: inline-block;
-  font-size: 9.5px;
-  background-color: #424242;
-  color: #AFAFAF !important;
-  margin-top: 8px;
-}
-
-.expanded-button {
-  display: block;
-  margin: auto;
-  margin-top: 10px;
-  font-weight: bold;
-  width: 50% !important;
-  background: #ababab !important;
-  color: black !important;
-  font-weight: bold;
-  width: 50% !important;
-}
-
-.hints {
-  font-style: italic;
-  font-size: 1.2rem;
-  color: #4297F9;
-}
-
-html:not(.mobile) .button-general:hover {
-  cursor: default;
-  background-color: #E9E9E9 !important;
-  color: #363638 !important;
-}
-
-/* Night mode styles */
-.nightMode .hints, .night_mode .hints {
-  color: cyan;
-}
-
-.nightMode .card, .night_mode .card {
-  background-color: #272828 !important;
-  color: #FFFAFA !important;
-}
-`;
-document.head.appendChild(style);
-</script>
-{{/AI Conversation Summary}}"""
+            template['afmt'] = _BASIC_AFMT
             mw.col.models.add_template(note_type, template)
             
             # Save the model
@@ -3591,21 +4176,11 @@ Conversation Summary:"""
             }
             
             # Convert to JSON
-            json_data = json.dumps(data).encode('utf-8')
-            
-            # Create request
-            req = urllib.request.Request(
-                'https://api.openai.com/v1/chat/completions',
-                data=json_data,
-                headers={
-                    'Content-Type': 'application/json',
-                    'Authorization': f'Bearer {OPENAI_API_KEY}'
-                }
-            )
+            json_data = _json_dumps(data)
             
-            # Make API call
-            with urllib.request.urlopen(req, timeout=30) as response:
-                result = json.loads(response.read().decode('utf-8'))
+            # Make API call on the pooled keep-alive connection
+            with _openai_post(json_data, timeout=30) as response:
+                result = _json_loads(response.read())
                 
             self.conversation_summary = result['choices'][0]['message']['content'].strip()
             
@@ -3613,82 +4188,47 @@ Conversation Summary:"""
             print(f"Error generating summary: {e}")
             self.conversation_summary = "Error generating conversation summary"
     
-    def generate_conversation_summary(self):
-        """Generate conversation summary for the cards"""
-        try:
-            # Use the same summary generation logic as the summary feature
-            summary_worker = SummaryWorker(self.conversation_text, self.config)
-            summary_worker.start()
-            summary_worker.wait()  # Wait for completion
-            
-            # Get the summary (this is a simplified approach)
-            # In a full implementation, you might want to make this async too
-            self.conversation_summary = "Generated from AI conversation - see summary feature for details"
-        except:
-            self.conversation_summary = "AI conversation summary not available"
-    
     def parse_flashcards(self, text: str) -> List[Dict]:
         """Parse the generated flashcard text into individual cards"""
         flashcards = []
         
-        if "cloze" in self.format_combo.currentText().lower():
-            # Parse cloze cards - look for {{c1:: patterns
-            lines = text.split('\n')
-            current_card = ""
-            
-            for line in lines:
+        if self._is_cloze:
+            # Parse cloze cards - look for {{c1:: patterns. Lines collect
+            # in a list and join on close instead of quadratic str concat
+            current_lines = []
+
+            for line in text.split('\n'):
                 line = line.strip()
-                if line and '{{c' in line:
-                    if current_card:
-                        flashcards.append({'content': current_card.strip()})
-                    current_card = line
-                elif line and current_card:
-                    current_card += "\n" + line
-                elif not line and current_card:
-                    flashcards.append({'content': current_card.strip()})
-                    current_card = ""
-            
-            if current_card:
-                flashcards.append({'content': current_card.strip()})
-        
+                if line and _CLOZE_RE.search(line):
+                    if current_lines:
+                        flashcards.append({'content': '\n'.join(current_lines)})
+                    current_lines = [line]
+                elif line and current_lines:
+                    current_lines.append(line)
+                elif not line and current_lines:
+                    flashcards.append({'content': '\n'.join(current_lines)})
+                    current_lines = []
+
+            if current_lines:
+                flashcards.append({'content': '\n'.join(current_lines)})
+
         else:
-            # Parse basic cards - look for Front:/Back: patterns
-            lines = text.split('\n')
-            current_front = ""
-            current_back = ""
-            in_front = False
-            in_back = False
-            
-            for line in lines:
-                line = line.strip()
-                
-                if line.lower().startswith('front:'):
-                    if current_front and current_back:
-                        flashcards.append({'front': current_front.strip(), 'back': current_back.strip()})
-                    current_front = line[6:].strip()  # Remove "Front:"
-                    current_back = ""
-                    in_front = True
-                    in_back = False
-                elif line.lower().startswith('back:'):
-                    current_back = line[5:].strip()  # Remove "Back:"
-                    in_front = False
-                    in_back = True
-                elif line and in_front:
-                    current_front += "\n" + line
-                elif line and in_back:
-                    current_back += "\n" + line
-                elif not line and current_front and current_back:
-                    flashcards.append({'front': current_front.strip(), 'back': current_back.strip()})
-                    current_front = ""
-                    current_back = ""
-                    in_front = False
-                    in_back = False
-            
+            # Parse basic cards in one compiled-regex sweep; each match is
+            # a Front:/Back: label plus its block up to the next label
+            current = {}
+            for m in _CARD_SECTION_RE.finditer(text):
+                label = m.group(1).lower()
+                if label == 'front' and 'front' in current:
+                    if current.get('front') and current.get('back'):
+                        flashcards.append(current)
+                    current = {}
+                current[label] = m.group(2).strip()
+
             # Add the last card if exists
-            if current_front and current_back:
-                flashcards.append({'front': current_front.strip(), 'back': current_back.strip()})
-        
-        return flashcards 
+            if current.get('front') and current.get('back'):
+                flashcards.append(current)
+
+        return flashcards
 
 class CardRefinementWorker(QThread):
     """Worker thread for refining individual flashcards"""
@@ -3752,21 +4292,11 @@ Refined card:"""
             }
             
             # Convert to JSON
-            json_data = json.dumps(data).encode('utf-8')
+            json_data = _json_dumps(data)
             
-            # Create request
-            req = urllib.request.Request(
-                'https://api.openai.com/v1/chat/completions',
-                data=json_data,
-                headers={
-                    'Content-Type': 'application/json',
-                    'Authorization': f'Bearer {OPENAI_API_KEY}'
-                }
-            )
-            
-            # Make API call
-            with urllib.request.urlopen(req, timeout=30) as response:
-                result = json.loads(response.read().decode('utf-8'))
+            # Make API call on the pooled keep-alive connection
+            with _openai_post(json_data, timeout=30) as response:
+                result = _json_loads(response.read())
                 
             refined_content = result['choices'][0]['message']['content'].strip()
             self.refinement_complete.emit(refined_content)
@@ -3781,7 +4311,7 @@ class CardRefinementDialog(QDialog):
         super().__init__(parent)
         self.card_index = card_index
         self.config = config
-        self.theme_colors = get_theme_colors()
+        self.theme_colors = config_manager.theme_colors()
         self.init_ui()
     
     def init_ui(self):
@@ -3803,17 +4333,9 @@ class CardRefinementDialog(QDialog):
         layout = QVBoxLayout(self)
         
         # Title
-        title = QLabel(f"🔧 Refine Card {self.card_index + 1}")
-        title.setStyleSheet(f"""
-            QLabel {{
-                font-size: 16px;
-                font-weight: bold;
-                color: #17a2b8;
-                padding: 10px;
-                margin-bottom: 10px;
-            }}
-        """)
-        layout.addWidget(title)
+        self.title_label = QLabel(f"🔧 Refine Card {self.card_index + 1}")
+        self.title_label.setStyleSheet(_REFINE_TITLE_QSS)
+        layout.addWidget(self.title_label)
         
         # Instructions
         instructions = QLabel("Describe how you want to refine this flashcard:")
@@ -3843,34 +4365,11 @@ class CardRefinementDialog(QDialog):
         
         cancel_btn = QPushButton("Cancel")
         cancel_btn.clicked.connect(self.reject)
-        cancel_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #6c757d;
-                color: white;
-                border: none;
-                border-radius: 6px;
-                padding: 8px 16px;
-            }
-            QPushButton:hover {
-                background-color: #5a6268;
-            }
-        """)
-        
+        cancel_btn.setStyleSheet(_CANCEL_BTN_QSS)
+
         refine_btn = QPushButton("🔧 Refine Card")
         refine_btn.clicked.connect(self.accept)
-        refine_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #17a2b8;
-                color: white;
-                border: none;
-                border-radius: 6px;
-                padding: 8px 16px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #138496;
-            }
-        """)
+        refine_btn.setStyleSheet(_COPY_BTN_QSS)
         
         button_layout.addStretch()
         button_layout.addWidget(cancel_btn)
@@ -3878,6 +4377,13 @@ class CardRefinementDialog(QDialog):
         
         layout.addLayout(button_layout)
     
+    def set_card_index(self, card_index: int):
+        """Retarget a reused dialog at another card with a fresh prompt"""
+        self.card_index = card_index
+        self.setWindowTitle(f"Refine Card {card_index + 1}")
+        self.title_label.setText(f"🔧 Refine Card {card_index + 1}")
+        self.prompt_input.clear()
+
     def get_refinement_prompt(self) -> str:
         """Get the refinement prompt from the input field"""
-        return self.prompt_input.toPlainText().strip() 
\ No newline at end of file
+        return self.prompt_input.toPlainText().strip()
\ No newline at end of file
@@ -6,8 +6,14 @@ Uses built-in libraries and developer's API key for seamless user experience
 import json
 import sqlite3
 import os
+import re
+import threading
+import time
 import urllib.request
 import urllib.parse
+import urllib.error
+from collections import deque
+from functools import lru_cache
 from typing import List, Dict, Optional
 from datetime import datetime
 
@@ -25,63 +31,245 @@ except ImportError:
     OPENAI_API_KEY = "your-openai-api-key-here"
     print("AI Chat: Please create api_config.py with your OpenAI API key")
 
+OPENAI_CHAT_URL = 'https://api.openai.com/v1/chat/completions'
+
+# Compiled once; strip_html runs per field on every chat-window open
+_HTML_TAG_RE = re.compile(r'<[^>]*>')
+
+@lru_cache(maxsize=256)
+def _extract_card_content(note_id: int, note_mod: int, items: tuple) -> str:
+    """Join a note's non-empty fields as readable plain text.
+
+    Cached on (id, mod) so reopening chat on an unmodified card skips the
+    per-field HTML stripping; editing the note bumps mod and misses.
+    """
+    content_parts = []
+    for field_name, field_value in items:
+        # Skip blank fields before paying for the regex pass
+        if not field_value.strip():
+            continue
+        clean_value = _HTML_TAG_RE.sub('', field_value)
+        if clean_value.strip():
+            content_parts.append(f"{field_name}: {clean_value}")
+
+    return "\n\n".join(content_parts)
+
+# Keep-alive connection pool for the OpenAI endpoint. urllib3 ships with
+# Anki (a dependency of requests); reusing the TLS session saves the
+# handshake round trip on every message after the first. Fall back to
+# plain one-shot urllib if it's unavailable.
+try:
+    import urllib3
+    _http_pool = urllib3.PoolManager(num_pools=1, maxsize=2, retries=False)
+except ImportError:
+    _http_pool = None
+
+# orjson is several times faster on these payloads and works in bytes
+# directly; it is not a hard dependency, so fall back to the stdlib
+try:
+    from orjson import loads as _json_loads
+    from orjson import dumps as _json_dumps  # compact UTF-8 bytes
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj):
+        return json.dumps(
+            obj, ensure_ascii=False, separators=(',', ':')
+        ).encode('utf-8')
+
+# The key is fixed for the process lifetime, so the headers dict is too
+_OPENAI_HEADERS = {
+    'Content-Type': 'application/json',
+    'Authorization': f'Bearer {OPENAI_API_KEY}'
+}
+
+def _openai_post(json_data: bytes, timeout: int = 60):
+    """POST to the chat completions endpoint, reusing a pooled connection.
+
+    Returns a file-like response usable as a context manager that supports
+    read() and line iteration, matching urllib.request.urlopen.
+    """
+    if _http_pool is not None:
+        response = _http_pool.urlopen(
+            'POST', OPENAI_CHAT_URL, body=json_data, headers=_OPENAI_HEADERS,
+            timeout=timeout, preload_content=False
+        )
+        if response.status >= 400:
+            # urllib3 doesn't raise on HTTP error statuses the way urllib
+            # does; turn them into the same HTTPError so callers keep
+            # reporting e.g. "HTTP Error 401: Unauthorized"
+            body = response.read().decode('utf-8', 'replace')
+            response.release_conn()
+            reason = response.reason or 'HTTP Error'
+            if body.strip():
+                reason = f"{reason} - {body.strip()}"
+            raise urllib.error.HTTPError(
+                OPENAI_CHAT_URL, response.status, reason, response.headers, None
+            )
+        return response
+    req = urllib.request.Request(OPENAI_CHAT_URL, data=json_data, headers=_OPENAI_HEADERS)
+    return urllib.request.urlopen(req, timeout=timeout)
+
 class ChatDatabase:
     """Manages chat history storage for flashcards"""
     
     def __init__(self):
         self.db_path = os.path.join(mw.addonManager.addonsFolder(), "ai_chat_addon", "chat_history.db")
+        # One long-lived connection keeps SQLite's page cache warm across
+        # the session instead of paying connection setup per message; the
+        # lock serializes writes from the GUI thread and worker callbacks
+        self.conn = None
+        self._lock = threading.Lock()
         self.init_db()
-    
+
     def init_db(self):
         """Initialize the chat history database"""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS chat_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                card_id INTEGER NOT NULL,
-                timestamp TEXT NOT NULL,
-                role TEXT NOT NULL,
-                content TEXT NOT NULL
-            )
-        ''')
-        conn.commit()
-        conn.close()
-    
+
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # WAL halves the fsyncs per write and lets the history load read
+        # concurrently with saves; the rest trims per-statement overhead
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-8000")  # 8 MB page cache
+        with self.conn:
+            # Plain INTEGER PRIMARY KEY aliases the rowid; AUTOINCREMENT
+            # would add a sqlite_sequence update to every insert for
+            # monotonicity this log doesn't need
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS chat_history (
+                    id INTEGER PRIMARY KEY,
+                    card_id INTEGER NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    role TEXT NOT NULL,
+                    content TEXT NOT NULL
+                )
+            ''')
+            # Satisfies the WHERE card_id ... ORDER BY timestamp query with
+            # an ordered range scan instead of a full scan plus sort
+            self.conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_chat_card_ts
+                ON chat_history(card_id, timestamp)
+            ''')
+
+    def close(self):
+        """Close the persistent connection on profile shutdown"""
+        with self._lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
     def save_message(self, card_id: int, role: str, content: str):
         """Save a chat message to the database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO chat_history (card_id, timestamp, role, content)
-            VALUES (?, ?, ?, ?)
-        ''', (card_id, datetime.now().isoformat(), role, content))
-        conn.commit()
-        conn.close()
-    
+        with self._lock:
+            with self.conn:
+                self.conn.execute('''
+                    INSERT INTO chat_history (card_id, timestamp, role, content)
+                    VALUES (?, ?, ?, ?)
+                ''', (card_id, datetime.now().isoformat(), role, content))
+
+    def save_pair(self, card_id: int, user_content: str, assistant_content: str):
+        """Save a user/AI exchange in one transaction (one fsync, not two)"""
+        now = datetime.now().isoformat()
+        with self._lock:
+            with self.conn:
+                self.conn.executemany('''
+                    INSERT INTO chat_history (card_id, timestamp, role, content)
+                    VALUES (?, ?, ?, ?)
+                ''', [(card_id, now, "user", user_content),
+                      (card_id, now, "assistant", assistant_content)])
+
+    def clear_history(self, card_id: int):
+        """Delete all stored messages for a card"""
+        with self._lock:
+            with self.conn:
+                self.conn.execute(
+                    "DELETE FROM chat_history WHERE card_id = ?", (card_id,)
+                )
+
     def get_chat_history(self, card_id: int) -> List[Dict]:
-        """Retrieve chat history for a specific card"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
+        """Retrieve chat history for a specific card.
+
+        Reads skip the write lock: WAL lets them run alongside writes.
+        """
+        rows = self.conn.execute('''
             SELECT timestamp, role, content FROM chat_history
             WHERE card_id = ?
             ORDER BY timestamp ASC
-        ''', (card_id,))
-        
+        ''', (card_id,)).fetchall()
+
         history = []
-        for row in cursor.fetchall():
+        for row in rows:
             history.append({
                 'timestamp': row[0],
                 'role': row[1],
                 'content': row[2]
             })
-        
-        conn.close()
+
         return history
 
+class AIResponseWorker(QThread):
+    """Worker thread that fetches the AI response off the GUI thread.
+
+    urllib is synchronous; running it on the event loop would freeze the
+    whole UI for the duration of the API call.
+    """
+
+    chunk_received = pyqtSignal(str)  # Streamed fragment of the reply
+    response_ready = pyqtSignal(str)  # Full reply once the stream ends
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, messages: List[Dict]):
+        super().__init__()
+        self.messages = messages
+
+    def run(self):
+        """Issue the OpenAI request in the background, streaming the reply"""
+        try:
+            data = {
+                "model": "gpt-3.5-turbo",
+                "messages": self.messages,
+                "max_tokens": 500,
+                "temperature": 0.7,
+                "stream": True
+            }
+
+            json_data = _json_dumps(data)
+
+            # Accumulate deltas and emit them coalesced (~20 Hz) so the
+            # GUI thread isn't signalled once per token
+            parts = []
+            emit_start = 0
+            last_emit = 0.0
+
+            with _openai_post(json_data, timeout=60) as response:
+                for raw_line in response:
+                    if not raw_line.startswith(b'data: '):
+                        continue
+                    payload = raw_line[6:].strip()
+                    if payload == b'[DONE]':
+                        break
+                    try:
+                        delta = _json_loads(payload)['choices'][0]['delta'].get('content')
+                    except (ValueError, KeyError, IndexError):
+                        continue
+                    if not delta:
+                        continue
+                    parts.append(delta)
+                    now = time.monotonic()
+                    if now - last_emit > 0.05:
+                        self.chunk_received.emit(''.join(parts[emit_start:]))
+                        emit_start = len(parts)
+                        last_emit = now
+
+            if emit_start < len(parts):
+                self.chunk_received.emit(''.join(parts[emit_start:]))
+            self.response_ready.emit(''.join(parts).strip())
+
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+
 class AIChatWindow(QDialog):
     """Simple chat window for AI conversations about flashcards"""
     
@@ -89,7 +277,18 @@ class AIChatWindow(QDialog):
         super().__init__(parent)
         self.card = card
         self.card_content = card_content
-        self.chat_db = ChatDatabase()
+        self.chat_db = get_chat_db()  # Shared instance with the persistent connection
+        self._ai_streaming = False  # True once the current reply has started
+        # User message of the exchange in flight; written together with the
+        # AI reply so the pair commits atomically without a lock held open
+        # across the asynchronous round trip
+        self._pending_user = None
+        # The card content is fixed for the life of the window, so the
+        # system prompt is built once rather than per send
+        self._system_msg = {
+            "role": "system",
+            "content": f"You are a helpful study assistant. The user is studying a flashcard with the following content:\n\n{self.card_content}\n\nHelp them understand the material by answering questions and providing explanations. Keep responses concise and educational."
+        }
         
         self.setWindowTitle("AI Chat - Flashcard Assistant")
         self.setMinimumSize(600, 400)
@@ -117,7 +316,9 @@ class AIChatWindow(QDialog):
         chat_group = QGroupBox("Chat History")
         chat_layout = QVBoxLayout(chat_group)
         
-        self.chat_history = QTextEdit()
+        # Plain-text widget: chat lines carry no markup and QPlainTextEdit
+        # appends without re-laying-out the whole document
+        self.chat_history = QPlainTextEdit()
         self.chat_history.setReadOnly(True)
         chat_layout.addWidget(self.chat_history)
         
@@ -155,18 +356,32 @@ class AIChatWindow(QDialog):
     
     def load_chat_history(self):
         """Load and display existing chat history for this card"""
+        # Read once; afterwards only the fixed-size context window stays
+        # in memory and the database is a write-only durable log
         history = self.chat_db.get_chat_history(self.card.id)
-        
+        self._ctx = deque(history, maxlen=6)
+        if not history:
+            return
+
+        # Render the backlog in one document set instead of one append
+        # (and one full re-layout) per message
+        lines = []
         for message in history:
             timestamp = datetime.fromisoformat(message['timestamp']).strftime("%H:%M:%S")
             role = "You" if message['role'] == "user" else "AI"
-            
-            self.append_to_chat(f"[{timestamp}] {role}: {message['content']}")
+            lines.append(f"[{timestamp}] {role}: {message['content']}")
+
+        self.chat_history.setUpdatesEnabled(False)
+        self.chat_history.setPlainText("\n\n".join(lines) + "\n")
+        self.chat_history.setUpdatesEnabled(True)
+
+        scrollbar = self.chat_history.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
     
     def append_to_chat(self, text: str):
         """Add text to the chat history display"""
-        self.chat_history.append(text)
-        self.chat_history.append("")  # Add empty line for spacing
+        self.chat_history.appendPlainText(text)
+        self.chat_history.appendPlainText("")  # Add empty line for spacing
         
         # Scroll to bottom
         scrollbar = self.chat_history.verticalScrollBar()
@@ -187,124 +402,134 @@ class AIChatWindow(QDialog):
         timestamp = datetime.now().strftime("%H:%M:%S")
         self.append_to_chat(f"[{timestamp}] You: {user_message}")
         
-        # Save user message
-        self.chat_db.save_message(self.card.id, "user", user_message)
-        
-        # Get AI response
-        ai_response = self.get_ai_response(user_message)
-        
-        if ai_response:
+        # Buffer the user message until the AI reply lands, then write the
+        # pair in one transaction. Keeping a database lock held across the
+        # exchange would deadlock the GUI thread if e.g. Clear History ran
+        # while the reply was still in flight.
+        self._pending_user = user_message
+        self._ctx.append({"role": "user", "content": user_message})
+
+        # Fetch the AI response on a worker thread; the button stays
+        # disabled until the reply (or an error) comes back
+        self._ai_streaming = False
+        self.worker = AIResponseWorker(self.build_messages())
+        self.worker.chunk_received.connect(self.on_ai_chunk)
+        self.worker.response_ready.connect(self.on_ai_response)
+        self.worker.error_occurred.connect(self.on_ai_error)
+        self.worker.start()
+
+    def build_messages(self) -> List[Dict]:
+        """Build the OpenAI message list for the current conversation"""
+        # Recent history for context; the tail already ends with the
+        # just-sent user message
+        return [self._system_msg] + [
+            {"role": msg["role"], "content": msg["content"]}
+            for msg in self._ctx
+        ]
+
+    def on_ai_chunk(self, delta: str):
+        """Append a streamed fragment of the AI reply as it arrives"""
+        if not self._ai_streaming:
+            timestamp = datetime.now().strftime("%H:%M:%S")
+            self.chat_history.appendPlainText(f"[{timestamp}] AI: ")
+            self._ai_streaming = True
+
+        cursor = self.chat_history.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(delta)
+
+        # Scroll to bottom
+        scrollbar = self.chat_history.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+
+    def on_ai_response(self, ai_response: str):
+        """Save the completed AI response once the stream ends"""
+        if self._ai_streaming:
+            self.chat_history.appendPlainText("")  # Spacing line after the reply
+            self._ai_streaming = False
+        else:
+            # Stream produced no chunks (e.g. empty reply); show it whole
             timestamp = datetime.now().strftime("%H:%M:%S")
             self.append_to_chat(f"[{timestamp}] AI: {ai_response}")
-            
-            # Save AI response
+
+        # Persist the user/AI pair in one transaction
+        pending_user, self._pending_user = self._pending_user, None
+        if pending_user is not None:
+            self.chat_db.save_pair(self.card.id, pending_user, ai_response)
+        else:
             self.chat_db.save_message(self.card.id, "assistant", ai_response)
-        
+        self._ctx.append({"role": "assistant", "content": ai_response})
+
+        # Re-enable button
+        self.send_button.setEnabled(True)
+        self.send_button.setText("Send")
+
+    def on_ai_error(self, error_message: str):
+        """Show an error from the worker without saving it as history"""
+        # Drop the buffered user message so the failed pair leaves no trace
+        self._pending_user = None
+        # Keep the cache in step with the dropped user message
+        if self._ctx and self._ctx[-1]["role"] == "user":
+            self._ctx.pop()
+        self.append_to_chat(f"Sorry, I couldn't process your request right now. Error: {error_message}")
+
         # Re-enable button
         self.send_button.setEnabled(True)
         self.send_button.setText("Send")
-    
-    def get_ai_response(self, user_message: str) -> Optional[str]:
-        """Get response from OpenAI API using built-in urllib"""
-        try:
-            # Prepare messages for OpenAI API
-            messages = [
-                {
-                    "role": "system",
-                    "content": f"You are a helpful study assistant. The user is studying a flashcard with the following content:\n\n{self.card_content}\n\nHelp them understand the material by answering questions and providing explanations. Keep responses concise and educational."
-                }
-            ]
-            
-            # Add recent chat history for context
-            recent_history = self.chat_db.get_chat_history(self.card.id)[-6:]  # Last 6 messages
-            for msg in recent_history:
-                messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
-            
-            # Add current user message
-            messages.append({
-                "role": "user",
-                "content": user_message
-            })
-            
-            # Prepare API request
-            data = {
-                "model": "gpt-3.5-turbo",
-                "messages": messages,
-                "max_tokens": 500,
-                "temperature": 0.7
-            }
-            
-            # Make HTTP request to OpenAI
-            req = urllib.request.Request(
-                "https://api.openai.com/v1/chat/completions",
-                data=json.dumps(data).encode('utf-8'),
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {OPENAI_API_KEY}"
-                }
-            )
-            
-            with urllib.request.urlopen(req) as response:
-                result = json.loads(response.read().decode('utf-8'))
-                return result['choices'][0]['message']['content'].strip()
-            
-        except Exception as e:
-            return f"Sorry, I couldn't process your request right now. Error: {str(e)}"
     
     def clear_chat_history(self):
         """Clear chat history for this card"""
         if askUser("Are you sure you want to clear the chat history for this card?"):
             # Clear from database
-            conn = sqlite3.connect(self.chat_db.db_path)
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM chat_history WHERE card_id = ?", (self.card.id,))
-            conn.commit()
-            conn.close()
-            
+            self.chat_db.clear_history(self.card.id)
+            self._ctx.clear()
+
             # Clear display
             self.chat_history.clear()
             showInfo("Chat history cleared.")
 
+# Static button HTML injected into the reviewer page; built once
+_CHAT_BUTTON_HTML = '''
+<div id="ai-chat-button-container" style="position: fixed; top: 10px; right: 10px; z-index: 9999;">
+    <button id="ai-chat-button" onclick="pycmd('ai_chat')" style="
+        background: linear-gradient(135deg, #0078d4, #005a9f);
+        color: white;
+        border: none;
+        padding: 10px 20px;
+        border-radius: 25px;
+        cursor: pointer;
+        font-size: 14px;
+        font-weight: bold;
+        box-shadow: 0 2px 10px rgba(0,120,212,0.3);
+        transition: all 0.3s ease;
+        font-family: system-ui, -apple-system, sans-serif;
+    " onmouseover="this.style.transform='scale(1.05)'" onmouseout="this.style.transform='scale(1)'">
+        🤖 Chat with AI
+    </button>
+</div>
+'''
+
+# One idempotent snippet: a no-op when the button already exists, so a
+# card flip costs a single eval round-trip and no DOM remove+insert
+_CHAT_BUTTON_JS = (
+    "if (!document.getElementById('ai-chat-button-container')) {"
+    f"document.body.insertAdjacentHTML('beforeend', `{_CHAT_BUTTON_HTML}`);"
+    "}"
+)
+
 class ReviewerButton:
     """Handles the chat button in the reviewer"""
-    
+
     def __init__(self):
         self.current_card = None
-    
+
     def add_chat_button(self, reviewer, card):
         """Add chat button to the reviewer"""
         self.current_card = card
-        
-        # Create button HTML that gets injected into the page
-        chat_button_html = '''
-        <div id="ai-chat-button-container" style="position: fixed; top: 10px; right: 10px; z-index: 9999;">
-            <button id="ai-chat-button" onclick="pycmd('ai_chat')" style="
-                background: linear-gradient(135deg, #0078d4, #005a9f);
-                color: white;
-                border: none;
-                padding: 10px 20px;
-                border-radius: 25px;
-                cursor: pointer;
-                font-size: 14px;
-                font-weight: bold;
-                box-shadow: 0 2px 10px rgba(0,120,212,0.3);
-                transition: all 0.3s ease;
-                font-family: system-ui, -apple-system, sans-serif;
-            " onmouseover="this.style.transform='scale(1.05)'" onmouseout="this.style.transform='scale(1)'">
-                🤖 Chat with AI
-            </button>
-        </div>
-        '''
-        
+
         # Inject the button directly into the reviewer
         if hasattr(reviewer.web, 'eval'):
-            # Remove any existing button first
-            reviewer.web.eval("var existing = document.getElementById('ai-chat-button-container'); if (existing) existing.remove();")
-            # Add the new button
-            reviewer.web.eval(f"document.body.insertAdjacentHTML('beforeend', `{chat_button_html}`);")
+            reviewer.web.eval(_CHAT_BUTTON_JS)
     
     def open_chat_window(self):
         """Open the AI chat window"""
@@ -327,38 +552,44 @@ class ReviewerButton:
         try:
             # Get the note
             note = card.note()
-            
-            # Extract field contents
-            content_parts = []
-            for field_name, field_value in note.items():
-                # Remove HTML tags for cleaner text
-                clean_value = self.strip_html(field_value)
-                if clean_value.strip():
-                    content_parts.append(f"{field_name}: {clean_value}")
-            
-            return "\n\n".join(content_parts)
-            
+
+            return _extract_card_content(note.id, note.mod, tuple(note.items()))
+
         except Exception as e:
             return f"Error extracting card content: {str(e)}"
     
     def strip_html(self, text: str) -> str:
         """Remove HTML tags from text"""
-        import re
-        # Simple HTML tag removal
-        clean = re.compile('<.*?>')
-        return re.sub(clean, '', text)
+        return _HTML_TAG_RE.sub('', text)
 
 # Global instances
 reviewer_button = ReviewerButton()
-chat_db = ChatDatabase()
+
+# Shared ChatDatabase, created lazily on first chat-window open so addon
+# import doesn't pay the makedirs + DDL cost
+_chat_db = None
+
+def get_chat_db():
+    global _chat_db
+    if _chat_db is None:
+        _chat_db = ChatDatabase()
+    return _chat_db
+
+def _close_chat_db():
+    global _chat_db
+    if _chat_db is not None:
+        _chat_db.close()
+        _chat_db = None
 
 def init_addon():
     """Initialize the add-on"""
     # Add hooks for reviewer
     addHook("reviewStateShortcuts", on_reviewer_shortcuts)
+    # The question hook alone suffices: the answer side shows the same
+    # card and the injected button is idempotent anyway
     gui_hooks.reviewer_did_show_question.append(on_show_question)
-    gui_hooks.reviewer_did_show_answer.append(on_show_answer)
     gui_hooks.webview_did_receive_js_message.append(on_js_message)
+    gui_hooks.profile_will_close.append(_close_chat_db)
 
 def on_reviewer_shortcuts(shortcuts):
     """Add keyboard shortcuts for the reviewer"""
@@ -368,10 +599,6 @@ def on_show_question(card):
     """Called when a question is shown in the reviewer"""
     reviewer_button.add_chat_button(mw.reviewer, card)
 
-def on_show_answer(card):
-    """Called when an answer is shown in the reviewer"""
-    reviewer_button.add_chat_button(mw.reviewer, card)
-
 def on_js_message(handled, message, context):
     """Handle JavaScript messages from the reviewer"""
     if message == "ai_chat":